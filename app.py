@@ -1,9 +1,25 @@
-from flask import Flask, request, abort, render_template, url_for, redirect, Response
-from datetime import date, timedelta
-from bisect import bisect_right
+from flask import Flask, request, abort, render_template, url_for, redirect, Response, g, has_request_context
+from flask import before_render_template, template_rendered
+from flask.logging import default_handler
+from datetime import date, datetime, timedelta
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, namedtuple
+from collections.abc import Mapping
+from functools import wraps
+import gc
+import hashlib
 import json
+import logging
 import os
+import queue
 import random
+import signal
+import struct
+import sys
+import threading
+import time
+
+from sudoku_generator import PackFile, PackTable, check_board, next_hint, solution_path
 
 app = Flask(__name__)
 
@@ -26,7 +42,7 @@ def build_archive(dates):
     return archive
 
 def get_daily_or_404(d_iso: str):
-    row = DAILY.get(d_iso)
+    row = get_data().daily.get(d_iso)
     if not row:
         abort(404, f"Geen sudoku voor {d_iso}")
     return row
@@ -34,39 +50,25 @@ def get_daily_or_404(d_iso: str):
 def is_future(d_iso: str) -> bool:
     return d_iso > get_today_iso()
 
-def render_solution_table(solution81: str) -> str:
-    # eenvoudige tabel (solution.html kan dit mooier stylen)
-    html = ["<table class='solution-grid'>"]
-    for r in range(9):
-        html.append("<tr>")
-        for c in range(9):
-            v = solution81[r * 9 + c]
-            html.append(f"<td>{v}</td>")
-        html.append("</tr>")
-    html.append("</table>")
-    return "\n".join(html)
-
 def clamp_to_visible(d_iso: str):
     # zorg dat je nooit voorbij "vandaag" navigeert via knoppen
     last_visible = get_last_visible()
     if d_iso > last_visible:
         return last_visible
-    if d_iso < ALL_DATES[0]:
-        return ALL_DATES[0]
+    first = get_data().dates[0]
+    if d_iso < first:
+        return first
     return d_iso
 
 def nav_links_daily(d_iso: str, size_key: str):
     # prev/next alleen binnen zichtbare set (<= vandaag)
-    visible_set = get_visible_set()
-    d_obj = date.fromisoformat(d_iso)
-    prev_d = (d_obj - timedelta(days=1)).isoformat()
-    next_d = (d_obj + timedelta(days=1)).isoformat()
+    prev_d, next_d = get_data().date_index.neighbors(d_iso)
 
-    prev_url = url_for("sudoku", date=prev_d) if prev_d in DAILY else None
-    next_url = url_for("sudoku", date=next_d) if next_d in visible_set else None
+    prev_url = url_for("sudoku", date=prev_d) if prev_d else None
+    next_url = url_for("sudoku", date=next_d) if next_d else None
 
-    prev_big = url_for("groter", date=prev_d, size=size_key) if prev_d in DAILY else None
-    next_big = url_for("groter", date=next_d, size=size_key) if next_d in visible_set else None
+    prev_big = url_for("groter", date=prev_d, size=size_key) if prev_d else None
+    next_big = url_for("groter", date=next_d, size=size_key) if next_d else None
 
     return prev_url, next_url, prev_big, next_big
 
@@ -75,52 +77,472 @@ def load_json(path):
         return json.load(f)
 
 # -----------------------------
-# Data laden: daily
+# Datums: zichtbaarheid en archief
 # -----------------------------
-DATA = load_json("daily.json")
-DAILY = {row["date"]: row for row in DATA}
-ALL_DATES = sorted(DAILY.keys())
-if not ALL_DATES:
-    raise RuntimeError("daily.json bevat geen puzzels.")
-
 def get_today_iso():
     return date.today().isoformat()
 
-def get_visible_dates(today_iso=None):
-    today_iso = today_iso or get_today_iso()
-    idx = bisect_right(ALL_DATES, today_iso)
-    if idx == 0:
-        return ALL_DATES[:]
-    return ALL_DATES[:idx]
+class DateIndex:
+    """
+    Zichtbare datums (<= vandaag) als grens-index in een gesorteerde datumlijst
+    (een list of een DateColumn). De grens wordt één keer per dag met bisect
+    bepaald; daarna is "laatste zichtbare" O(1) en "zichtbaar?" en buren
+    O(log n), zonder lijst- of setkopieën.
+    """
+
+    def __init__(self, dates):
+        self.dates = dates
+        # (vandaag, grens) als één tuple, zodat threads nooit een half bijgewerkte staat zien
+        self._state = (None, 0)
+
+    def cutoff(self, today_iso=None) -> int:
+        """Aantal zichtbare datums: dates[:cutoff] ligt op of vóór vandaag."""
+        today_iso = today_iso or get_today_iso()
+        day, cutoff = self._state
+        if day != today_iso:
+            # nieuwe dag (of andere peildatum): grens één keer opnieuw zoeken
+            cutoff = bisect_right(self.dates, today_iso)
+            if cutoff == 0:
+                # alles ligt in de toekomst: dan is alles zichtbaar
+                cutoff = len(self.dates)
+            self._state = (today_iso, cutoff)
+        return cutoff
+
+    def find(self, d_iso: str):
+        """Positie van d_iso in dates, of None."""
+        i = bisect_left(self.dates, d_iso)
+        if i < len(self.dates) and self.dates[i] == d_iso:
+            return i
+        return None
+
+    def last_visible(self, today_iso=None) -> str:
+        return self.dates[self.cutoff(today_iso) - 1]
+
+    def is_visible(self, d_iso: str, today_iso=None) -> bool:
+        i = self.find(d_iso)
+        return i is not None and i < self.cutoff(today_iso)
+
+    def neighbors(self, d_iso: str, today_iso=None):
+        """(vorige dag, volgende dag), of None als die er niet is of nog niet zichtbaar is."""
+        d_obj = date.fromisoformat(d_iso)
+        prev_d = (d_obj - timedelta(days=1)).isoformat()
+        next_d = (d_obj + timedelta(days=1)).isoformat()
+        return (
+            prev_d if self.find(prev_d) is not None else None,
+            next_d if self.is_visible(next_d, today_iso) else None,
+        )
 
-def get_visible_set(today_iso=None):
-    return set(get_visible_dates(today_iso))
+    def visible_dates(self, today_iso=None):
+        return self.dates[:self.cutoff(today_iso)]
+
+def get_visible_dates(today_iso=None):
+    return get_data().date_index.visible_dates(today_iso)
 
 def get_last_visible(today_iso=None):
-    dates = get_visible_dates(today_iso)
-    return dates[-1]
+    return get_data().date_index.last_visible(today_iso)
+
+ArchiveSnapshot = namedtuple("ArchiveSnapshot", "cutoff tree counts years months")
+
+def _archive_snapshot(cutoff, tree):
+    counts = {y: {m: len(ds) for m, ds in months.items()} for y, months in tree.items()}
+    return ArchiveSnapshot(cutoff, tree, counts, sorted(tree), {y: sorted(ms) for y, ms in tree.items()})
+
+class ArchiveCache:
+    """
+    Archief (jaar -> maand -> datums) voor de zichtbare datums van een DateIndex,
+    met het aantal dagen per maand al uitgerekend. Schuift de grens naar voren
+    (nieuwe dag), dan komen alleen de nieuwe datums erbij: de aangeraakte maand
+    en het jaar worden gekopieerd, de rest van de boom wordt gedeeld. Een
+    snapshot wordt nooit meer aangepast, dus lezende threads zien altijd een
+    consistente boom.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self._snap = _archive_snapshot(0, {})
+
+    def snapshot(self, today_iso=None):
+        cutoff = self.index.cutoff(today_iso)
+        snap = self._snap
+        if cutoff != snap.cutoff:
+            if cutoff > snap.cutoff:
+                snap = self._extend(snap, cutoff)
+            else:
+                # grens terug (klok verzet of andere peildatum): opnieuw opbouwen
+                snap = _archive_snapshot(cutoff, build_archive(self.index.dates[:cutoff]))
+            self._snap = snap
+        return snap
+
+    def _extend(self, snap, cutoff):
+        tree = dict(snap.tree)
+        counts = dict(snap.counts)
+        months = dict(snap.months)
+        new_years = set()
+        new_months = set()
+        for d in self.index.dates[snap.cutoff:cutoff]:
+            y = int(d[:4])
+            m = int(d[5:7])
+            if y not in new_years:
+                new_years.add(y)
+                tree[y] = dict(tree.get(y, {}))
+                counts[y] = dict(counts.get(y, {}))
+            if (y, m) not in new_months:
+                new_months.add((y, m))
+                tree[y][m] = list(tree[y].get(m, []))
+            tree[y][m].append(d)
+            counts[y][m] = len(tree[y][m])
+        for y in new_years:
+            months[y] = sorted(tree[y])
+        return ArchiveSnapshot(cutoff, tree, counts, sorted(tree), months)
 
 def get_archive(today_iso=None):
-    dates = get_visible_dates(today_iso)
-    return build_archive(dates)
+    return get_data().archive.snapshot(today_iso).tree
 
 # -----------------------------
-# Data laden: packs
+# Data store
 # -----------------------------
+# Alle data zit in één onveranderlijke DataSnapshot. Een request pakt aan het
+# begin de actuele snapshot (g.data) en gebruikt die tot het eind, ook als er
+# intussen herladen wordt. Herladen gebeurt in een achtergrondthread bij een
+# gewijzigde mtime/grootte: elke RELOAD_INTERVAL seconden wordt gekeken, dus een
+# nieuw bestand neerzetten is genoeg. Onder gunicorn kijkt elke worker bovendien
+# direct na het opstarten en na een SIGHUP aan de worker (zie gunicorn.conf.py);
+# een SIGHUP aan de master start de workers opnieuw, met hetzelfde resultaat.
+DAILY_PATH = "daily.json"
+PACK_DIR = "packs"
 PACK_CATS = ["makkelijk", "gemiddeld", "moeilijk", "extreem"]
-PACKS = {}
-PACK_MAX_ID = {}
-
-for cat in PACK_CATS:
-    p = os.path.join("packs", f"{cat}.json")
-    if os.path.exists(p):
-        rows = load_json(p)
-        # rows is list; we gebruiken 1-based index
-        PACKS[cat] = rows
-        PACK_MAX_ID[cat] = len(rows)
+RELOAD_INTERVAL = float(os.environ.get("SUDOKU_RELOAD_INTERVAL", "30"))  # 0 = niet pollen
+
+log = logging.getLogger("sudoku.data")
+if not log.hasHandlers():
+    # gunicorn configureert alleen zijn eigen loggers; zonder handler zou de
+    # herlaadregel (duur, geheugen) nergens terechtkomen
+    log.addHandler(default_handler)
+    log.setLevel(logging.INFO)
+
+DataSnapshot = namedtuple(
+    "DataSnapshot", "version stamps daily dates date_index archive packs pack_max_id api_json"
+)
+
+def file_stamp(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+_STALE_BIN_WARNED = set()
+
+def pack_source(cat: str) -> str:
+    # binair pack (sudoku_generator.py pack-bin) heeft voorrang op de json,
+    # behalve als de json nieuwer is (opnieuw gegenereerd zonder pack-bin)
+    p_bin = os.path.join(PACK_DIR, f"{cat}.bin")
+    p_json = os.path.join(PACK_DIR, f"{cat}.json")
+    bin_stamp, json_stamp = file_stamp(p_bin), file_stamp(p_json)
+    if bin_stamp is None:
+        return p_json
+    if json_stamp is not None and json_stamp[0] > bin_stamp[0]:
+        if (p_bin, json_stamp) not in _STALE_BIN_WARNED:
+            _STALE_BIN_WARNED.add((p_bin, json_stamp))
+            log.warning("%s is ouder dan %s; de json wordt geladen (draai pack-bin opnieuw)", p_bin, p_json)
+        return p_json
+    return p_bin
+
+def current_stamps():
+    stamps = {DAILY_PATH: file_stamp(DAILY_PATH)}
+    for cat in PACK_CATS:
+        p = pack_source(cat)
+        stamps[cat] = (p, file_stamp(p))
+    return stamps
+
+# Daily puzzels als één platte bytes-buffer met vaste records (datum, puzzel,
+# oplossing, clues, difficulty, grade), gesorteerd op datum. Geen dict of string
+# per rij: na een fork (gunicorn --preload) hoeft geen refcount van duizenden
+# kleine objecten aangeraakt te worden, dus blijven de pagina's gedeeld.
+DAILY_RECORD = struct.Struct("<10s81s81sBBB")
+_MISSING = 0xFF
+
+class DateColumn:
+    """De datums van een DailyTable als gesorteerde, alleen-lezen reeks (werkt met bisect)."""
+    __slots__ = ("_buf", "_count")
+
+    def __init__(self, buf: bytes, count: int):
+        self._buf = buf
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("datum buiten de tabel")
+        start = i * DAILY_RECORD.size
+        return self._buf[start:start + 10].decode("ascii")
+
+class DailyTable:
+    """datum -> rij-dict, maar opgeslagen als DAILY_RECORD-records in één buffer."""
+    __slots__ = ("_buf", "labels", "dates")
+
+    def __init__(self, rows):
+        by_date = {row["date"]: row for row in rows}
+        labels = []
+        label_ids = {}
+
+        def label_id(value):
+            if value is None:
+                return _MISSING
+            if value not in label_ids:
+                label_ids[value] = len(labels)
+                labels.append(value)
+            return label_ids[value]
+
+        records = []
+        for d in sorted(by_date):
+            row = by_date[d]
+            if len(d) != 10 or len(row["puzzle"]) != 81 or len(row["solution"]) != 81:
+                raise ValueError(f"daily.json: ongeldige rij voor {d}")
+            records.append(DAILY_RECORD.pack(
+                d.encode("ascii"), row["puzzle"].encode("ascii"), row["solution"].encode("ascii"),
+                row.get("clues", _MISSING), label_id(row.get("difficulty")), label_id(row.get("grade")),
+            ))
+        self._buf = b"".join(records)
+        self.labels = tuple(labels)
+        self.dates = DateColumn(self._buf, len(records))
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __contains__(self, d_iso) -> bool:
+        return self._find(d_iso) is not None
+
+    def _find(self, d_iso):
+        i = bisect_left(self.dates, d_iso)
+        if i < len(self.dates) and self.dates[i] == d_iso:
+            return i
+        return None
+
+    def get(self, d_iso, default=None):
+        i = self._find(d_iso)
+        if i is None:
+            return default
+        d, puzzle, solution, clues, difficulty, grade = DAILY_RECORD.unpack_from(self._buf, i * DAILY_RECORD.size)
+        row = {"date": d.decode("ascii")}
+        if difficulty != _MISSING:
+            row["difficulty"] = self.labels[difficulty]
+        if clues != _MISSING:
+            row["clues"] = clues
+        row["puzzle"] = puzzle.decode("ascii")
+        row["solution"] = solution.decode("ascii")
+        if grade != _MISSING:
+            row["grade"] = self.labels[grade]
+        return row
+
+class LazyPacks(Mapping):
+    """
+    cat -> rijen (PackFile of PackTable). Een categorie wordt pas bij de eerste
+    opvraging geladen; bij herladen worden al geladen, ongewijzigde categorieën
+    uit de vorige snapshot overgenomen.
+    """
+
+    def __init__(self, sources, prev=None):
+        self._sources = sources   # cat -> (pad, stempel)
+        self._loaded = {}
+        self._lock = threading.Lock()
+        if prev is not None:
+            for cat, source in sources.items():
+                if prev._sources.get(cat) == source and cat in prev._loaded:
+                    self._loaded[cat] = prev._loaded[cat]
+
+    def __getitem__(self, cat):
+        rows = self._loaded.get(cat)
+        if rows is None:
+            if cat not in self._sources:
+                raise KeyError(cat)
+            with self._lock:
+                rows = self._loaded.get(cat)
+                if rows is None:
+                    rows = self._loaded[cat] = load_pack(cat, *self._sources[cat])
+        return rows
+
+    def __contains__(self, cat) -> bool:
+        # zonder te laden
+        return cat in self._sources
+
+    def __iter__(self):
+        return iter(self._sources)
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def load_all(self):
+        for cat in self._sources:
+            self[cat]
+
+class PackSizes(Mapping):
+    """cat -> aantal puzzels; laadt de categorie via LazyPacks als dat nog niet gebeurd is."""
+
+    def __init__(self, packs: LazyPacks):
+        self._packs = packs
+
+    def __getitem__(self, cat) -> int:
+        return len(self._packs[cat])
+
+    def __contains__(self, cat) -> bool:
+        return cat in self._packs
+
+    def __iter__(self):
+        return iter(self._packs)
+
+    def __len__(self) -> int:
+        return len(self._packs)
+
+def load_daily():
+    daily = DailyTable(load_json(DAILY_PATH))
+    if not len(daily):
+        raise RuntimeError("daily.json bevat geen puzzels.")
+    date_index = DateIndex(daily.dates)
+    return daily, daily.dates, date_index, ArchiveCache(date_index)
+
+def load_pack(cat: str, path: str, stamp):
+    if stamp is None:
+        return []
+    if path.endswith(".bin"):
+        # mmap, rijen worden per request gedecodeerd
+        return PackFile(path)
+    # rows is list; we gebruiken 1-based index
+    rows = load_json(path)
+    if not rows:
+        return rows
+    try:
+        return PackTable.from_rows(rows, rows[0].get("difficulty", cat))
+    except (KeyError, ValueError):
+        # ids niet 1..n of velden die niet in het binaire formaat passen: dan gewoon de lijst
+        log.warning("%s: niet compact op te slaan, pack blijft als lijst geladen", path)
+        return rows
+
+def build_snapshot(prev=None) -> DataSnapshot:
+    """Nieuwe snapshot; bestanden met dezelfde stempel als in prev worden niet opnieuw gelezen."""
+    stamps = current_stamps()
+
+    if prev is not None and prev.stamps[DAILY_PATH] == stamps[DAILY_PATH]:
+        daily, dates, date_index, archive = prev.daily, prev.dates, prev.date_index, prev.archive
     else:
-        PACKS[cat] = []
-        PACK_MAX_ID[cat] = 0
+        daily, dates, date_index, archive = load_daily()
+
+    packs = LazyPacks({cat: stamps[cat] for cat in PACK_CATS},
+                      prev=prev.packs if prev is not None else None)
+
+    version = prev.version + 1 if prev is not None else 1
+    return DataSnapshot(
+        version, stamps, daily, dates, date_index, archive,
+        packs, PackSizes(packs), {},
+    )
+
+def resident_bytes():
+    """(huidig, piek) RSS van dit proces in bytes; None als het platform dat niet kent."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        rss = None
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Linux: kB
+    except ImportError:
+        return rss, None
+    return rss, max(peak, rss or 0)
+
+class DataStore:
+    """Houdt de actuele DataSnapshot bij en wisselt hem atomisch bij een herlaadactie."""
+
+    def __init__(self):
+        self.current = build_snapshot()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._watcher_pid = None
+        self._failed_stamps = None
+
+    def reload(self, force: bool = False) -> bool:
+        """Herlaad gewijzigde bestanden; True als er een nieuwe snapshot is."""
+        with self._lock:
+            prev = self.current
+            stamps = current_stamps()
+            if not force and stamps in (prev.stamps, self._failed_stamps):
+                # niets veranderd, of dezelfde kapotte bestanden als bij de vorige poging
+                return False
+
+            start_t = time.perf_counter()
+            try:
+                snap = build_snapshot(None if force else prev)
+            except Exception:
+                self._failed_stamps = stamps
+                raise
+
+            self.current = snap
+            PAGE_CACHE.clear()
+            changed = [k for k in snap.stamps if snap.stamps[k] != prev.stamps[k]]
+            rss, peak = resident_bytes()
+            log.info(
+                "Data herladen (versie %d, %s) in %.0f ms, RSS %s MB, piek %s MB",
+                snap.version, ", ".join(changed) or "alles", (time.perf_counter() - start_t) * 1000,
+                "?" if rss is None else f"{rss / 1e6:.1f}", "?" if peak is None else f"{peak / 1e6:.1f}",
+            )
+            return True
+
+    def request_reload(self):
+        self.start_watcher()
+        self._wake.set()
+
+    def start_watcher(self):
+        # threads overleven een fork niet: per proces (gunicorn worker) één watcher
+        if self._watcher_pid == os.getpid():
+            return
+        self._watcher_pid = os.getpid()
+        threading.Thread(target=self._watch, name="data-watcher", daemon=True).start()
+
+    def _watch(self):
+        while True:
+            self._wake.wait(RELOAD_INTERVAL or None)
+            self._wake.clear()
+            try:
+                self.reload()
+            except Exception:
+                # kapotte of half geschreven bestanden: oude snapshot blijft staan
+                log.exception("Herladen van de data mislukt")
+
+STORE = DataStore()
+
+# Met SUDOKU_PRELOAD=1 (bedoeld voor gunicorn --preload) laadt de master alles
+# vooraf en zet gc.freeze() de geladen objecten buiten de garbage collector,
+# zodat de workers de pagina's copy-on-write blijven delen. Zonder die vlag
+# wordt een pack-categorie pas bij de eerste opvraging geladen.
+if os.environ.get("SUDOKU_PRELOAD") == "1":
+    STORE.current.packs.load_all()
+    gc.collect()
+    gc.freeze()
+
+def get_data() -> DataSnapshot:
+    if has_request_context() and "data" in g:
+        return g.data
+    return STORE.current
+
+@app.before_request
+def bind_data():
+    STORE.start_watcher()
+    g.data = STORE.current
+
+def install_reload_signal():
+    """
+    Laat een SIGHUP aan dit proces de data herladen, en kijk meteen of er iets
+    veranderd is. Voor gunicorn vanuit post_worker_init: daarvóór zet gunicorn
+    de signalen van een worker terug, een handler bij het importeren gaat verloren.
+    """
+    signal.signal(signal.SIGHUP, lambda signum, frame: STORE.request_reload())
+    STORE.request_reload()
 
 # -----------------------------
 # Labels & sizes
@@ -221,13 +643,14 @@ def render_daily(d: str, size_key: str, mode: str):
 
 def get_pack_row_or_404(cat: str, n: int):
     cat = (cat or "").lower()
-    if cat not in PACKS or PACK_MAX_ID.get(cat, 0) == 0:
+    data = get_data()
+    if cat not in data.packs or data.pack_max_id.get(cat, 0) == 0:
         abort(404, "Categorie bestaat niet (of pack ontbreekt).")
 
-    if n < 1 or n > PACK_MAX_ID[cat]:
+    if n < 1 or n > data.pack_max_id[cat]:
         abort(404, "Puzzelnummer bestaat niet.")
 
-    return PACKS[cat][n - 1]
+    return data.packs[cat][n - 1]
 
 def render_pack(cat: str, n: int, size_key: str, mode: str):
     cat = cat.lower()
@@ -238,7 +661,7 @@ def render_pack(cat: str, n: int, size_key: str, mode: str):
     # prev/next ook op pack_groter, maar nooit voorbij de grenzen
     if mode in ("pack", "pack_groter"):
         prev_url = url_for("pack_view", cat=cat, n=n - 1) if n > 1 else None
-        next_url = url_for("pack_view", cat=cat, n=n + 1) if n < PACK_MAX_ID[cat] else None
+        next_url = url_for("pack_view", cat=cat, n=n + 1) if n < get_data().pack_max_id[cat] else None
     else:
         prev_url = None
         next_url = None
@@ -280,28 +703,170 @@ def render_pack(cat: str, n: int, size_key: str, mode: str):
         show_more_block=False,
     )
 
+# -----------------------------
+# Page cache
+# -----------------------------
+# Een puzzelpagina hangt alleen af van de URL (datum of pack-id, size, route),
+# de zichtbare datums (vorige/volgende knoppen) en het jaartal in de footer.
+# Met die sleutel bewaren we de gerenderde bytes plus een sterke ETag.
+PAGE_CACHE_SIZE = 4096
+MAX_AGE_FOREVER = 365 * 24 * 3600
+
+class PageCache:
+    """Begrensde LRU-cache voor gerenderde pagina's (thread-safe)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+PAGE_CACHE = PageCache(PAGE_CACHE_SIZE)
+
+def seconds_until_midnight() -> int:
+    now = datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max(1, int((midnight - now).total_seconds()))
+
+def seconds_until_new_year() -> int:
+    now = datetime.now()
+    new_year = datetime(now.year + 1, 1, 1)
+    return max(1, int((new_year - now).total_seconds()))
+
+def is_settled_daily(d_iso, today_iso: str) -> bool:
+    # een expliciete, al zichtbare datum vóór vandaag verandert niet meer (ook vorige/volgende niet)
+    return bool(d_iso) and d_iso < today_iso and get_data().date_index.is_visible(d_iso, today_iso)
+
+def cached_page(kind: str):
+    """
+    Decorator voor HTML-routes: serveert uit PAGE_CACHE, zet ETag en
+    Cache-Control en antwoordt 304 op een passende If-None-Match.
+    kind "pack": onveranderlijk behalve het laatste id van het pack;
+    kind "daily": alleen voor afgeronde datums. De rest tot middernacht.
+    Ook een onveranderlijke pagina verloopt op 1 januari: de footer toont het jaar.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            today = get_today_iso()
+            data = get_data()
+            key = (request.url, data.version, data.date_index.cutoff(today), today[:4])
+            entry = PAGE_CACHE.get(key)
+            if entry is None:
+                body = view(*args, **kwargs).encode("utf-8")
+                entry = (body, hashlib.blake2b(body, digest_size=16).hexdigest())
+                PAGE_CACHE.put(key, entry)
+
+            body, etag = entry
+            resp = Response(body, mimetype="text/html")
+            resp.set_etag(etag)
+            if kind == "pack":
+                # het laatste id krijgt een "volgende" knop als het pack groeit (of verandert bij dedupe)
+                settled = kwargs.get("n", 0) < data.pack_max_id.get((kwargs.get("cat") or "").lower(), 0)
+            else:
+                settled = is_settled_daily(request.args.get("date"), today)
+            if settled:
+                max_age = min(MAX_AGE_FOREVER, seconds_until_new_year())
+                resp.headers["Cache-Control"] = f"public, max-age={max_age}, immutable"
+            else:
+                resp.headers["Cache-Control"] = f"public, max-age={seconds_until_midnight()}"
+            return resp.make_conditional(request)
+        return wrapper
+    return decorator
+
+# -----------------------------
+# Fragmenten (print en oplossing)
+# -----------------------------
+# Het 9x9-raster hangt alleen af van de 81 cijfers, niet van de size (die zit in
+# de css van print.html). Eén fragment per puzzel of oplossing dient dus alle
+# sizes en beide routes (daily en pack); een LRU houdt de warme puzzels vast.
+FRAGMENT_CACHE_SIZE = 8192
+FRAGMENT_CACHE = PageCache(FRAGMENT_CACHE_SIZE)
+
+PRINT_CELL_HTML = {ch: f"<td class='cell'>{'&nbsp;' if ch == '0' else ch}</td>" for ch in "0123456789"}
+SOLUTION_CELL_HTML = {ch: f"<td>{ch}</td>" for ch in "0123456789"}
+
+def cached_fragment(kind: str, digits81: str, build) -> str:
+    key = (kind, digits81)
+    html = FRAGMENT_CACHE.get(key)
+    if html is None:
+        html = build(digits81)
+        FRAGMENT_CACHE.put(key, html)
+    return html
+
+def build_print_grid(puzzle81: str) -> str:
+    cells = [PRINT_CELL_HTML[ch] for ch in puzzle81]
+    return "".join("<tr>" + "".join(cells[i:i + 9]) + "</tr>" for i in range(0, 81, 9))
+
+def build_solution_table(solution81: str) -> str:
+    # eenvoudige tabel (solution.html kan dit mooier stylen)
+    html = ["<table class='solution-grid'>"]
+    for i in range(0, 81, 9):
+        html.append("<tr>")
+        html.extend(SOLUTION_CELL_HTML[ch] for ch in solution81[i:i + 9])
+        html.append("</tr>")
+    html.append("</table>")
+    return "\n".join(html)
+
+def render_solution_table(solution81: str) -> str:
+    return cached_fragment("solution", solution81, build_solution_table)
+
+def render_print(title: str, heading: str, back_url: str, puzzle: str, size_key: str) -> str:
+    """Printpagina (daily en pack): print.html met het gecachte raster."""
+    cell = SIZE_TO_CELL[size_key]
+    return render_template(
+        "print.html",
+        title=title,
+        heading=heading,
+        back_url=back_url,
+        cell=cell,
+        font_px=int(cell * 0.55),
+        grid=cached_fragment("print", puzzle, build_print_grid),
+    )
+
 # -----------------------------
 # Routes: daily
 # -----------------------------
 @app.get("/")
+@cached_page("daily")
 def home():
     today = get_today_iso()
-    d = today if today in DAILY else get_last_visible(today)
+    d = today if today in get_data().daily else get_last_visible(today)
     return render_daily(d, size_key="normaal", mode="sudoku")
 
 @app.get("/sudoku")
+@cached_page("daily")
 def sudoku():
     d = request.args.get("date", get_today_iso())
     size_key = norm_size(request.args.get("size", "normaal"), "normaal")
     return render_daily(d, size_key=size_key, mode="sudoku")
 
 @app.get("/groter")
+@cached_page("daily")
 def groter():
     d = request.args.get("date", get_today_iso())
     size_key = norm_size(request.args.get("size", "groot"), "groot")
     return render_daily(d, size_key=size_key, mode="groter")
 
 @app.get("/oplossing")
+@cached_page("daily")
 def oplossing():
     d = request.args.get("date", get_today_iso())
     d = clamp_to_visible(d)
@@ -319,81 +884,43 @@ def oplossing():
     )
 
 @app.get("/print")
+@cached_page("daily")
 def print_puzzle():
     d = request.args.get("date", get_today_iso())
     d = clamp_to_visible(d)
     size_key = norm_size(request.args.get("size", "groot"), "groot")
     row = get_daily_or_404(d)
 
-    cell = SIZE_TO_CELL[size_key]
-    font_px = int(cell * 0.55)
-
-    # print as simple HTML
-    return f"""<!doctype html>
-<html lang="nl">
-<head>
-<meta charset="utf-8" />
-<meta name="viewport" content="width=device-width, initial-scale=1" />
-<title>Print sudoku {format_nl_date(d)}</title>
-<style>
-  body {{ font-family: Arial, sans-serif; padding: 20px; text-align: center; }}
-  h1 {{ margin: 0 0 10px 0; }}
-  table.grid {{ border-collapse: collapse; margin: 0 auto; }}
-  td.cell {{
-    width:{cell}px; height:{cell}px;
-    text-align:center; border:1px solid #000;
-    font-size:{font_px}px;
-    font-weight: 800;
-  }}
-  tr:nth-child(3) td, tr:nth-child(6) td {{ border-bottom:3px solid #000; }}
-  td:nth-child(3), td:nth-child(6) {{ border-right:3px solid #000; }}
-  .noprint {{ margin-top: 16px; }}
-  @media print {{ .noprint {{ display:none; }} body {{ padding:0; }} }}
-</style>
-</head>
-<body>
-<h1>Sudoku {format_nl_date(d)}</h1>
-<table class="grid">
-{''.join([
-    '<tr>' + ''.join([
-        f"<td class='cell'>{('&nbsp;' if row['puzzle'][r*9+c]=='0' else row['puzzle'][r*9+c])}</td>"
-        for c in range(9)
-    ]) + '</tr>'
-    for r in range(9)
-])}
-</table>
-<div class="noprint"><p><a href="{url_for('sudoku', date=d)}">← Terug</a></p></div>
-<script>window.onload=function(){{window.print();}}</script>
-</body>
-</html>"""
+    return render_print(
+        title=f"Print sudoku {format_nl_date(d)}",
+        heading=f"Sudoku {format_nl_date(d)}",
+        back_url=url_for("sudoku", date=d),
+        puzzle=row["puzzle"],
+        size_key=size_key,
+    )
 
 # -----------------------------
 # Routes: archief
 # -----------------------------
 @app.get("/archief")
 def archief_jaren():
-    archive = get_archive()
-    years = sorted(archive.keys())
     return render_template(
         "archief_years.html",
-        years=years,
+        years=get_data().archive.snapshot().years,
         today_nl=format_nl_date(get_today_iso()),
     )
 
 @app.get("/archief/<int:year>")
 def archief_maanden(year: int):
-    months = get_archive().get(year)
-    if not months:
+    archive = get_data().archive.snapshot()
+    if not archive.tree.get(year):
         abort(404, f"Geen data voor {year}")
 
-    month_list = sorted(months.keys())
-    counts = {m: len(months[m]) for m in month_list}
-
     return render_template(
         "archief_months.html",
         year=year,
-        months=month_list,
-        counts=counts,
+        months=archive.months[year],
+        counts=archive.counts[year],
     )
 
 @app.get("/archief/<int:year>/<int:month>")
@@ -415,26 +942,30 @@ def archief_dagen(year: int, month: int):
 @app.get("/pack/random/<cat>")
 def pack_random(cat: str):
     cat = cat.lower()
-    if cat not in PACKS or PACK_MAX_ID.get(cat, 0) == 0:
+    max_id = get_data().pack_max_id.get(cat, 0)
+    if max_id == 0:
         abort(404, "Pack bestaat niet.")
-    n = random.randint(1, PACK_MAX_ID[cat])
+    n = random.randint(1, max_id)
     return redirect(url_for("pack_view", cat=cat, n=n))
 
 @app.get("/pack/<cat>/<int:n>")
+@cached_page("pack")
 def pack_view(cat: str, n: int):
     size_key = norm_size(request.args.get("size", "normaal"), "normaal")
     return render_pack(cat, n, size_key=size_key, mode="pack")
 
 @app.get("/pack/<cat>/<int:n>/groter")
+@cached_page("pack")
 def pack_groter(cat: str, n: int):
     size_key = norm_size(request.args.get("size", "groot"), "groot")
     return render_pack(cat, n, size_key=size_key, mode="pack_groter")
 
 @app.get("/pack/<cat>/<int:n>/oplossing")
+@cached_page("pack")
 def pack_oplossing(cat: str, n: int):
     row = get_pack_row_or_404(cat, n)
     diff_text = PACK_LABEL.get(cat, cat)
-    next_url = url_for("pack_oplossing", cat=cat, n=n + 1) if n < PACK_MAX_ID[cat] else None
+    next_url = url_for("pack_oplossing", cat=cat, n=n + 1) if n < get_data().pack_max_id[cat] else None
 
     return render_template(
         "solution.html",
@@ -448,52 +979,188 @@ def pack_oplossing(cat: str, n: int):
     )
 
 @app.get("/pack/<cat>/<int:n>/print")
+@cached_page("pack")
 def print_pack(cat: str, n: int):
     row = get_pack_row_or_404(cat, n)
     size_key = norm_size(request.args.get("size", "groot"), "groot")
 
-    cell = SIZE_TO_CELL[size_key]
-    font_px = int(cell * 0.55)
-
     title = f"Sudoku {PACK_LABEL.get(cat, cat)} #{n}"
+    return render_print(
+        title=f"Print {title}",
+        heading=title,
+        back_url=url_for("pack_view", cat=cat, n=n),
+        puzzle=row["puzzle"],
+        size_key=size_key,
+    )
 
-    return f"""<!doctype html>
-<html lang="nl">
-<head>
-<meta charset="utf-8" />
-<meta name="viewport" content="width=device-width, initial-scale=1" />
-<title>Print {title}</title>
-<style>
-  body {{ font-family: Arial, sans-serif; padding: 20px; text-align: center; }}
-  h1 {{ margin: 0 0 10px 0; }}
-  table.grid {{ border-collapse: collapse; margin: 0 auto; }}
-  td.cell {{
-    width:{cell}px; height:{cell}px;
-    text-align:center; border:1px solid #000;
-    font-size:{font_px}px;
-    font-weight: 800;
-  }}
-  tr:nth-child(3) td, tr:nth-child(6) td {{ border-bottom:3px solid #000; }}
-  td:nth-child(3), td:nth-child(6) {{ border-right:3px solid #000; }}
-  .noprint {{ margin-top: 16px; }}
-  @media print {{ .noprint {{ display:none; }} body {{ padding:0; }} }}
-</style>
-</head>
-<body>
-<h1>{title}</h1>
-<table class="grid">
-{''.join([
-    '<tr>' + ''.join([
-        f"<td class='cell'>{('&nbsp;' if row['puzzle'][r*9+c]=='0' else row['puzzle'][r*9+c])}</td>"
-        for c in range(9)
-    ]) + '</tr>'
-    for r in range(9)
-])}
-</table>
-<div class="noprint"><p><a href="{url_for('pack_view', cat=cat, n=n)}">← Terug</a></p></div>
-<script>window.onload=function(){{window.print();}}</script>
-</body>
-</html>"""
+# -----------------------------
+# API (json)
+# -----------------------------
+# Elke puzzel wordt per snapshot één keer naar json-bytes omgezet (data.api_json);
+# een request plakt alleen nog bytes aan elkaar.
+API_MAX_COUNT = 100
+DAILY_API_COUNT = 7
+PACK_API_COUNT = 20
+
+def entry_json(key, load_row) -> bytes:
+    cache = get_data().api_json
+    body = cache.get(key)
+    if body is None:
+        body = cache[key] = json.dumps(load_row(), separators=(",", ":")).encode("utf-8")
+    return body
+
+def daily_json(d_iso: str) -> bytes:
+    return entry_json(("daily", d_iso), lambda: get_data().daily.get(d_iso))
+
+def pack_json(cat: str, n: int) -> bytes:
+    return entry_json(("pack", cat, n), lambda: get_data().packs[cat][n - 1])
+
+def api_response(body: bytes, immutable: bool):
+    resp = Response(body, mimetype="application/json")
+    resp.set_etag(hashlib.blake2b(body, digest_size=16).hexdigest())
+    if immutable:
+        resp.headers["Cache-Control"] = f"public, max-age={MAX_AGE_FOREVER}, immutable"
+    else:
+        resp.headers["Cache-Control"] = f"public, max-age={seconds_until_midnight()}"
+    return resp.make_conditional(request)
+
+def api_error(status: int, message: str):
+    body = json.dumps({"error": message}).encode("utf-8")
+    return Response(body, status=status, mimetype="application/json")
+
+def api_list(items, **meta) -> bytes:
+    head = ",".join(f'"{k}":{json.dumps(v)}' for k, v in meta.items())
+    return b"{" + head.encode("utf-8") + b',"items":[' + b",".join(items) + b"]}"
+
+def api_count(default: int):
+    """count uit de query string, of None als die ongeldig is."""
+    try:
+        count = int(request.args.get("count", default))
+    except ValueError:
+        return None
+    return count if 1 <= count <= API_MAX_COUNT else None
+
+@app.get("/api/v1/daily/<d>")
+def api_daily(d: str):
+    today = get_today_iso()
+    if not get_data().date_index.is_visible(d, today):
+        return api_error(404, f"Geen sudoku voor {d}")
+    return api_response(daily_json(d), immutable=d < today)
+
+@app.get("/api/v1/daily")
+def api_daily_range():
+    """?from=<datum>&count=<n>: zichtbare puzzels vanaf from; zonder from de laatste count."""
+    count = api_count(DAILY_API_COUNT)
+    if count is None:
+        return api_error(400, f"count moet 1..{API_MAX_COUNT} zijn")
+
+    today = get_today_iso()
+    index = get_data().date_index
+    cutoff = index.cutoff(today)
+    start = request.args.get("from")
+    first = bisect_left(index.dates, start) if start else max(0, cutoff - count)
+    dates = index.dates[first:min(cutoff, first + count)]
+
+    body = api_list([daily_json(d) for d in dates], count=len(dates))
+    return api_response(body, immutable=bool(dates) and dates[-1] < today and len(dates) == count)
+
+@app.get("/api/v1/pack/<cat>/<int:n>")
+def api_pack(cat: str, n: int):
+    cat = cat.lower()
+    max_id = get_data().pack_max_id.get(cat, 0)
+    if max_id == 0:
+        return api_error(404, "Pack bestaat niet.")
+    if n < 1 or n > max_id:
+        return api_error(404, "Puzzelnummer bestaat niet.")
+    return api_response(pack_json(cat, n), immutable=True)
+
+@app.get("/api/v1/pack/<cat>")
+def api_pack_range(cat: str):
+    """?from=<id>&count=<n>: puzzels from..from+count-1 (voor zover ze bestaan)."""
+    cat = cat.lower()
+    max_id = get_data().pack_max_id.get(cat, 0)
+    if max_id == 0:
+        return api_error(404, "Pack bestaat niet.")
+    count = api_count(PACK_API_COUNT)
+    try:
+        first = int(request.args.get("from", 1))
+    except ValueError:
+        first = 0
+    if count is None or first < 1:
+        return api_error(400, f"from moet >= 1 en count 1..{API_MAX_COUNT} zijn")
+
+    ids = range(first, min(max_id, first + count - 1) + 1)
+    body = api_list([pack_json(cat, n) for n in ids], category=cat, total=max_id, count=len(ids))
+    # de laatste bladzijde groeit mee als het pack groter wordt
+    return api_response(body, immutable=len(ids) == count)
+
+# Hints en zetcontrole: POST {"date": <datum>, "board": <81 cijfers>} of
+# {"pack": <categorie>, "id": <n>, "board": ...}. De oplossing staat al in de
+# data; alleen het logische oplospad wordt per puzzel (en dataversie) één keer
+# berekend. Complete antwoorden per (puzzel, bord) staan in een LRU.
+PATH_CACHE = PageCache(1024)
+HINT_CACHE = PageCache(16384)
+
+def board_row(body: dict):
+    """(sleutel, rij) van de puzzel waar body naar verwijst, of een api_error."""
+    data = get_data()
+    if "date" in body:
+        d = body["date"]
+        if not isinstance(d, str) or not data.date_index.is_visible(d, get_today_iso()):
+            return api_error(404, f"Geen sudoku voor {d}")
+        return ("daily", d), data.daily.get(d)
+    cat, n = body.get("pack"), body.get("id")
+    if not isinstance(cat, str) or cat.lower() not in data.pack_max_id:
+        return api_error(404, "Pack bestaat niet.")
+    cat = cat.lower()
+    if not isinstance(n, int) or isinstance(n, bool) or not 1 <= n <= data.pack_max_id[cat]:
+        return api_error(404, "Puzzelnummer bestaat niet.")
+    return ("pack", cat, n), data.packs[cat][n - 1]
+
+def puzzle_path(key, puzzle: str):
+    """Logisch oplospad van een puzzel uit de data, per dataversie gecachet."""
+    key = (get_data().version,) + key
+    path = PATH_CACHE.get(key)
+    if path is None:
+        path = solution_path(puzzle)
+        PATH_CACHE.put(key, path)
+    return path
+
+def board_answer(kind: str):
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return api_error(400, "Verwacht een json-object met date of pack en id, plus board")
+    board = body.get("board")
+    if not isinstance(board, str) or len(board) != 81 or not board.isdigit() or not board.isascii():
+        return api_error(400, "board moet 81 cijfers (0 = leeg) zijn")
+    found = board_row(body)
+    if isinstance(found, Response):
+        return found
+    key, row = found
+
+    cache_key = (kind, get_data().version) + key + (board,)
+    answer_body = HINT_CACHE.get(cache_key)
+    if answer_body is None:
+        puzzle, solution = row["puzzle"], row["solution"]
+        answer = check_board(puzzle, board, solution)
+        if kind == "hint":
+            ok = not answer["conflicts"] and not answer["wrong"]
+            answer["hint"] = next_hint(board, solution, puzzle_path(key, puzzle)) if ok and not answer["solved"] else None
+        answer_body = json.dumps(answer, separators=(",", ":")).encode("utf-8")
+        HINT_CACHE.put(cache_key, answer_body)
+    resp = Response(answer_body, mimetype="application/json")
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+@app.post("/api/v1/check")
+def api_check():
+    """Conflicterende en foute cellen van een bord."""
+    return board_answer("check")
+
+@app.post("/api/v1/hint")
+def api_hint():
+    """Als check, plus de volgende logische stap (techniek, cel, cijfer) op een foutloos bord."""
+    return board_answer("hint")
 
 # -----------------------------
 # Route: meer (keuze pagina)
@@ -509,7 +1176,8 @@ def meer():
     except ValueError:
         nr_i = 1
 
-    max_id = PACK_MAX_ID.get(cat, 0) or max(PACK_MAX_ID.values() or [0])
+    pack_max_id = get_data().pack_max_id
+    max_id = pack_max_id.get(cat, 0) or max(pack_max_id.values() or [0])
 
     # clamp nr
     if max_id > 0:
@@ -526,47 +1194,327 @@ def meer():
     )
 
 # -----------------------------
-# SEO: robots.txt + sitemap.xml
+# SEO: robots.txt + sitemaps
 # -----------------------------
+SITE_BASE = "https://dagelijksesudoku.nl"
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+SITEMAP_BATCH = 500
+
+# naam -> (stempel, xml-bytes); een sitemap wordt opnieuw gemaakt zodra de stempel verandert
+SITEMAP_CACHE = {}
+
+def sitemap_urlset(urls):
+    yield '<?xml version="1.0" encoding="UTF-8"?>'
+    yield f'<urlset xmlns="{SITEMAP_NS}">'
+    batch = []
+    for u in urls:
+        batch.append(f"<url><loc>{u}</loc></url>")
+        if len(batch) == SITEMAP_BATCH:
+            yield "".join(batch)
+            batch = []
+    yield "".join(batch)
+    yield "</urlset>"
+
+def cached_xml(name: str, stamp, parts):
+    """
+    Stuur de XML-delen als streaming response en bewaar het resultaat onder name.
+    Zolang stamp gelijk blijft, gaat daarna de bewaarde versie in één keer mee.
+    """
+    hit = SITEMAP_CACHE.get(name)
+    if hit is not None and hit[0] == stamp:
+        return Response(hit[1], mimetype="application/xml")
+
+    def stream():
+        chunks = []
+        for part in parts:
+            chunk = part.encode("utf-8")
+            chunks.append(chunk)
+            yield chunk
+        SITEMAP_CACHE[name] = (stamp, b"".join(chunks))
+
+    return Response(stream(), mimetype="application/xml")
+
 @app.get("/robots.txt")
 def robots():
-    base = "https://dagelijksesudoku.nl"
     lines = [
         "User-agent: *",
         "Allow: /",
-        f"Sitemap: {base}/sitemap.xml",
+        f"Sitemap: {SITE_BASE}/sitemap.xml",
     ]
     return Response("\n".join(lines) + "\n", mimetype="text/plain")
 
 
 @app.get("/sitemap.xml")
 def sitemap():
-    base = "https://dagelijksesudoku.nl"
-    urls = [
-        f"{base}/",
-        f"{base}/archief",
-        f"{base}/meer",
-    ]
-
-    for d in get_visible_dates():
-        urls.append(f"{base}/sudoku?date={d}")
-
-    items = []
-    for u in urls:
-        items.append(
-            "<url>"
-            f"<loc>{u}</loc>"
-            "</url>"
-        )
+    # index: vaste pagina's, één sitemap per jaar daily en één per pack-categorie
+    archive = get_data().archive.snapshot()
+    names = ["sitemap-site.xml"]
+    names += [f"sitemap-{y}.xml" for y in archive.years]
+    names += [f"sitemap-pack-{cat}.xml" for cat in PACK_CATS if get_data().pack_max_id.get(cat, 0)]
 
+    items = "".join(f"<sitemap><loc>{SITE_BASE}/{name}</loc></sitemap>" for name in names)
     xml = (
         '<?xml version="1.0" encoding="UTF-8"?>'
-        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
-        + "".join(items) +
-        "</urlset>"
+        f'<sitemapindex xmlns="{SITEMAP_NS}">'
+        + items +
+        "</sitemapindex>"
     )
     return Response(xml, mimetype="application/xml")
 
+@app.get("/sitemap-site.xml")
+def sitemap_site():
+    urls = [
+        f"{SITE_BASE}/",
+        f"{SITE_BASE}/archief",
+        f"{SITE_BASE}/meer",
+    ]
+    return cached_xml("site", None, sitemap_urlset(urls))
+
+@app.get("/sitemap-<int:year>.xml")
+def sitemap_year(year: int):
+    data = get_data()
+    archive = data.archive.snapshot()
+    months = archive.tree.get(year)
+    if not months:
+        abort(404, f"Geen data voor {year}")
+
+    # afgeronde jaren veranderen niet meer; alleen het lopende jaar hangt aan de grens
+    cutoff = archive.cutoff if year == archive.years[-1] else None
+    stamp = (data.stamps[DAILY_PATH], cutoff)
+    urls = (f"{SITE_BASE}/sudoku?date={d}" for m in archive.months[year] for d in months[m])
+    return cached_xml(f"daily-{year}", stamp, sitemap_urlset(urls))
+
+@app.get("/sitemap-pack-<cat>.xml")
+def sitemap_pack(cat: str):
+    data = get_data()
+    count = data.pack_max_id.get(cat, 0)
+    if not count:
+        abort(404, "Pack bestaat niet.")
+
+    urls = (f"{SITE_BASE}/pack/{cat}/{n}" for n in range(1, count + 1))
+    return cached_xml(f"pack-{cat}", data.stamps[cat], sitemap_urlset(urls))
+
+# -----------------------------
+# Metrics (opt-in)
+# -----------------------------
+# Met SUDOKU_METRICS=1 houdt elke worker per endpoint histogrammen bij van de
+# totale tijd, de tijd in render_template (via de Flask-signalen, dus ook in
+# render_daily/render_pack) en de rest (data opzoeken, caches, serialiseren),
+# plus de responsgrootte. /metrics geeft dat in Prometheus-tekstformaat, samen
+# met het RSS van de worker. Elke gunicorn-worker heeft zijn eigen tellers: het
+# label pid maakt de series per worker uniek.
+#
+# Met SUDOKU_PROFILE_SLOW_MS > 0 samplet een achtergrondthread de stacks van
+# lopende requests; duurt een request langer dan die drempel, dan komen de
+# samples als gevouwen stacks (flamegraph.pl / speedscope) in SUDOKU_PROFILE_DIR.
+METRICS_ENABLED = os.environ.get("SUDOKU_METRICS") == "1"
+PROFILE_SLOW_MS = float(os.environ.get("SUDOKU_PROFILE_SLOW_MS", "0"))
+PROFILE_DIR = os.environ.get("SUDOKU_PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = float(os.environ.get("SUDOKU_PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_MIN_GAP = 60  # seconden tussen twee profielen van hetzelfde endpoint
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+
+class Histogram:
+    """Prometheus-histogram per label; buckets worden pas bij het exporteren cumulatief."""
+
+    def __init__(self, name: str, help_text: str, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label: str, value: float):
+        with self._lock:
+            s = self._series.get(label)
+            if s is None:
+                # len(buckets) + 1 tellers (de laatste is +Inf) en de som
+                s = self._series[label] = [0] * (len(self.buckets) + 1) + [0.0]
+            s[bisect_left(self.buckets, value)] += 1
+            s[-1] += value
+
+    def lines(self, labels: str):
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        for endpoint, s in sorted(series.items()):
+            lab = f'endpoint="{endpoint}",{labels}'
+            total = 0
+            for le, n in zip(self.buckets + ("+Inf",), s):
+                total += n
+                yield f'{self.name}_bucket{{{lab},le="{le}"}} {total}'
+            yield f"{self.name}_sum{{{lab}}} {round(s[-1], 6)}"
+            yield f"{self.name}_count{{{lab}}} {total}"
+
+REQUEST_SECONDS = Histogram("sudoku_request_seconds", "Tijd per request.", LATENCY_BUCKETS)
+RENDER_SECONDS = Histogram("sudoku_request_render_seconds",
+                           "Tijd in render_template per request (alleen requests die renderen).", LATENCY_BUCKETS)
+DATA_SECONDS = Histogram("sudoku_request_data_seconds",
+                         "Tijd per request buiten render_template: data, caches, serialiseren.", LATENCY_BUCKETS)
+RESPONSE_BYTES = Histogram("sudoku_response_bytes", "Grootte van de response body.", SIZE_BUCKETS)
+HISTOGRAMS = (REQUEST_SECONDS, RENDER_SECONDS, DATA_SECONDS, RESPONSE_BYTES)
+
+STATUS_COUNTS = {}
+STATUS_LOCK = threading.Lock()
+PROFILED_COUNT = [0]
+
+def fold_stack(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+class SlowRequestSampler:
+    """
+    Samplet de stacks van lopende requests; alleen trage requests worden bewaard.
+    Het wegschrijven gebeurt in de samplerthread: een request wacht nooit op de
+    schijf, en een map die niet beschrijfbaar is kost een logregel, geen 500.
+    """
+
+    def __init__(self, interval: float, out_dir: str):
+        self.interval = interval
+        self.out_dir = out_dir
+        self.active = {}
+        self.last_dump = {}
+        self.pending = queue.SimpleQueue()
+        self._pid = None
+        try:
+            os.makedirs(out_dir, exist_ok=True)
+        except OSError as e:
+            log.error("Profielmap %s niet aan te maken, trage requests worden niet bewaard: %s", out_dir, e)
+
+    def begin(self):
+        # threads overleven een fork niet: per proces (gunicorn worker) één sampler
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="slow-request-sampler", daemon=True).start()
+        self.active[threading.get_ident()] = {}
+
+    def end(self):
+        return self.active.pop(threading.get_ident(), None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            while not self.pending.empty():
+                self.write(*self.pending.get())
+            if not self.active:
+                continue
+            frames = sys._current_frames()
+            for tid, stacks in list(self.active.items()):
+                frame = frames.get(tid)
+                if frame is not None:
+                    key = fold_stack(frame)
+                    stacks[key] = stacks.get(key, 0) + 1
+
+    def dump(self, endpoint: str, elapsed: float, stacks: dict):
+        """Zet het profiel van een traag request klaar; de samplerthread schrijft het weg."""
+        now = time.time()
+        if not stacks or now - self.last_dump.get(endpoint, 0) < PROFILE_MIN_GAP:
+            return
+        self.last_dump[endpoint] = now
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{endpoint}-{elapsed * 1000:.0f}ms.folded"
+        self.pending.put((name, f"{request.method} {request.full_path}", elapsed, stacks))
+
+    def write(self, name: str, label: str, elapsed: float, stacks: dict):
+        path = os.path.join(self.out_dir, name)
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"# {label}\n")
+                for stack, n in sorted(stacks.items()):
+                    f.write(f"{stack} {n}\n")
+        except OSError as e:
+            log.error("Profiel van traag request %s (%.0f ms) niet weg te schrijven: %s", label, elapsed * 1000, e)
+            return
+        PROFILED_COUNT[0] += 1
+        log.warning("Traag request %s (%.0f ms), profiel in %s", label, elapsed * 1000, path)
+
+SAMPLER = SlowRequestSampler(PROFILE_INTERVAL, PROFILE_DIR) if PROFILE_SLOW_MS > 0 else None
+
+def metrics_begin():
+    g.metrics_t0 = time.perf_counter()
+    g.metrics_render = 0.0
+    if SAMPLER is not None:
+        SAMPLER.begin()
+
+def metrics_render_start(sender, template, context, **extra):
+    if has_request_context():
+        g.metrics_render_t0 = time.perf_counter()
+
+def metrics_render_done(sender, template, context, **extra):
+    if has_request_context() and "metrics_render_t0" in g:
+        g.metrics_render += time.perf_counter() - g.pop("metrics_render_t0")
+
+def metrics_record(resp):
+    if "metrics_t0" not in g:
+        return resp
+    elapsed = time.perf_counter() - g.metrics_t0
+    # onbekende urls onder één label, anders groeit het aantal series onbeperkt
+    endpoint = request.endpoint or "unmatched"
+    REQUEST_SECONDS.observe(endpoint, elapsed)
+    if g.metrics_render:
+        RENDER_SECONDS.observe(endpoint, g.metrics_render)
+    DATA_SECONDS.observe(endpoint, elapsed - g.metrics_render)
+    size = resp.calculate_content_length()
+    if size is not None:
+        RESPONSE_BYTES.observe(endpoint, size)
+    key = (endpoint, resp.status_code)
+    with STATUS_LOCK:
+        STATUS_COUNTS[key] = STATUS_COUNTS.get(key, 0) + 1
+
+    if SAMPLER is not None:
+        stacks = SAMPLER.end()
+        if elapsed * 1000 >= PROFILE_SLOW_MS:
+            SAMPLER.dump(endpoint, elapsed, stacks)
+    return resp
+
+def metrics_teardown(exc):
+    # bij een exception zonder response: sampler-state van deze thread opruimen
+    if SAMPLER is not None:
+        SAMPLER.end()
+
+def metrics_text() -> str:
+    labels = f'pid="{os.getpid()}"'
+    out = []
+    for hist in HISTOGRAMS:
+        out.extend(hist.lines(labels))
+
+    out.append("# HELP sudoku_requests_total Requests per endpoint en statuscode.")
+    out.append("# TYPE sudoku_requests_total counter")
+    with STATUS_LOCK:
+        counts = sorted(STATUS_COUNTS.items())
+    for (endpoint, status), n in counts:
+        out.append(f'sudoku_requests_total{{endpoint="{endpoint}",status="{status}",{labels}}} {n}')
+
+    rss, peak = resident_bytes()
+    for name, value, help_text in (
+        ("sudoku_process_resident_memory_bytes", rss, "Huidig RSS van de worker."),
+        ("sudoku_process_max_resident_memory_bytes", peak, "Hoogste RSS van de worker."),
+        ("sudoku_slow_requests_profiled_total", PROFILED_COUNT[0], "Weggeschreven profielen van trage requests."),
+        ("sudoku_data_version", get_data().version, "Versie van de geladen data (telt op bij herladen)."),
+    ):
+        if value is not None:
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {'counter' if name.endswith('_total') else 'gauge'}")
+            out.append(f"{name}{{{labels}}} {value}")
+    return "\n".join(out) + "\n"
+
+def metrics_endpoint():
+    return Response(metrics_text(), mimetype="text/plain; version=0.0.4")
+
+if METRICS_ENABLED:
+    app.before_request(metrics_begin)
+    app.after_request(metrics_record)
+    app.teardown_request(metrics_teardown)
+    before_render_template.connect(metrics_render_start, app)
+    template_rendered.connect(metrics_render_done, app)
+    app.add_url_rule("/metrics", "metrics", metrics_endpoint)
+
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,403 @@
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+# app.py wordt pas in de benchmarks zelf geïmporteerd: de startup-benchmark
+# moet kunnen kiezen of dat vóór of na een fork gebeurt.
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def synthetic_dates(years: int):
+    """Eén datum per dag, years jaar terug tot en met vandaag: daily.json na years jaar."""
+    days = 365 * years
+    d0 = date.today() - timedelta(days=days - 1)
+    return [(d0 + timedelta(days=i)).isoformat() for i in range(days)]
+
+def per_call_us(fn, repeat: int) -> float:
+    start_t = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start_t) / repeat * 1e6
+
+# -----------------------------
+# Archief
+# -----------------------------
+def bench_archive(sizes, repeat: int = 2000) -> dict:
+    """
+    Per archiefgrootte (in jaren): tijd per archief-opvraging met de cache,
+    zonder cache (build_archive per request, het oude gedrag) en per request
+    via de /archief routes. Met cache moet dit vlak blijven als het archief groeit.
+    """
+    import app as site
+
+    client = site.app.test_client()
+    old = site.STORE.current
+    results = {}
+    try:
+        for years in sizes:
+            dates = synthetic_dates(years)
+            today = dates[-1]
+            index = site.DateIndex(dates)
+            archive = site.ArchiveCache(index)
+            site.STORE.current = old._replace(dates=dates, date_index=index, archive=archive)
+            archive.snapshot(today)
+
+            year = int(today[:4])
+            urls = ["/archief", f"/archief/{year}", f"/archief/{year}/1"]
+            routes_us = per_call_us(lambda: [client.get(u, buffered=True) for u in urls], repeat // 10) / len(urls)
+
+            results[years] = {
+                "dates": len(dates),
+                "cached_us": per_call_us(lambda: archive.snapshot(today), repeat),
+                "rebuild_us": per_call_us(lambda: site.build_archive(dates), max(1, repeat // 100)),
+                "route_us": routes_us,
+            }
+    finally:
+        site.STORE.current = old
+    return results
+
+# -----------------------------
+# Opstarten
+# -----------------------------
+STARTUP_URLS = [
+    "/", "/archief", "/pack/makkelijk/1", "/pack/gemiddeld/2",
+    "/pack/moeilijk/3/oplossing", "/pack/extreem/4/print",
+]
+
+def private_kb(pid: int) -> int:
+    """Uniek (niet met andere processen gedeeld) geheugen van een proces in kB."""
+    total = 0
+    with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+        for line in f:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1])
+    return total
+
+def startup_probe(preload: bool, workers: int) -> dict:
+    """
+    Bootst gunicorn na in een vers proces. Met preload importeert de master
+    app.py (SUDOKU_PRELOAD=1) en forkt daarna; zonder preload importeert elke
+    worker zelf. Elke worker handelt STARTUP_URLS af, doet een gc-ronde en blijft dan staan,
+    zodat we zijn unieke geheugen kunnen meten.
+    """
+    master_import = 0.0
+    if preload:
+        os.environ["SUDOKU_PRELOAD"] = "1"
+        start_t = time.perf_counter()
+        import app  # noqa: F401
+        master_import = time.perf_counter() - start_t
+
+    children = []
+    for _ in range(workers):
+        ready_r, ready_w = os.pipe()
+        go_r, go_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            os.close(go_w)
+            start_t = time.perf_counter()
+            import app as worker_site
+            import_s = time.perf_counter() - start_t
+            client = worker_site.app.test_client()
+            for url in STARTUP_URLS:
+                client.get(url, buffered=True)
+            # een lang draaiende worker doet vroeg of laat een volledige gc-ronde
+            gc.collect()
+            os.write(ready_w, f"{import_s}\n".encode())
+            os.read(go_r, 1)
+            os._exit(0)
+        os.close(ready_w)
+        os.close(go_r)
+        children.append((pid, ready_r, go_w))
+
+    imports, private = [], []
+    for pid, ready_r, _ in children:
+        imports.append(float(os.read(ready_r, 64)))
+        private.append(private_kb(pid))
+    for pid, ready_r, go_w in children:
+        os.write(go_w, b"x")
+        os.waitpid(pid, 0)
+        os.close(ready_r)
+        os.close(go_w)
+
+    return {
+        "master_import_ms": master_import * 1000,
+        "worker_import_ms": sum(imports) / len(imports) * 1000,
+        "worker_private_mb": sum(private) / len(private) / 1024,
+    }
+
+def bench_startup(workers: int = 2) -> dict:
+    """Startup-probe zonder en met preload, elk in een eigen interpreter."""
+    results = {}
+    for preload in (False, True):
+        cmd = [sys.executable, os.path.abspath(__file__), "startup-probe", "--workers", str(workers)]
+        if preload:
+            cmd.append("--preload")
+        env = {k: v for k, v in os.environ.items() if k != "SUDOKU_PRELOAD"}
+        out = subprocess.run(cmd, check=True, capture_output=True, text=True, env=env).stdout
+        results["preload" if preload else "lazy"] = json.loads(out.strip().splitlines()[-1])
+    return results
+
+# -----------------------------
+# Suite (generator + routes, met baseline)
+# -----------------------------
+# Vaste seeds en vaste urls, zodat twee runs op dezelfde machine hetzelfde werk
+# doen. Snelheden zijn het beste van SUITE_ROUNDS rondes; allocaties zijn de
+# tracemalloc-piek per request. Vergelijk met een eerder opgeslagen baseline:
+# een snelheid die meer dan --tolerance lager uitvalt (of een allocatiepiek die
+# zoveel hoger uitvalt) is een regressie en geeft exitcode 1.
+SUITE_SEED = 20240601
+SUITE_ROUNDS = 3
+# vastgelegde baseline naast dit script (sites/packs uit de repo, --scale 1, --requests 300)
+SUITE_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+def best_rate(fn, items: int, rounds: int = SUITE_ROUNDS) -> float:
+    """Hoogste aantal items per seconde over rounds keer fn()."""
+    best = 0.0
+    for _ in range(rounds):
+        start_t = time.perf_counter()
+        fn()
+        best = max(best, items / (time.perf_counter() - start_t))
+    return best
+
+def bench_generator(scale: float = 1.0) -> dict:
+    import random
+    import sudoku_generator as sg
+
+    n_solve = max(1, int(200 * scale))
+    n_make = max(1, int(40 * scale))
+    n_pack = max(1, int(20 * scale))
+    results = {}
+
+    def solve_all():
+        for i in range(n_solve):
+            sg.generate_solution(SUITE_SEED + i)
+    results["solve"] = {"per_sec": best_rate(solve_all, n_solve)}
+
+    def sample_all():
+        for i in range(n_solve):
+            sg.sample_solution(sg.StableRandom(SUITE_SEED + i))
+    results["sample_solution"] = {"per_sec": best_rate(sample_all, n_solve)}
+
+    solutions = [sg.generate_solution(SUITE_SEED + i) for i in range(n_make)]
+    for cat in sg.DIFFICULTY_CLUES:
+        puzzles = []
+
+        def make_all():
+            puzzles.clear()
+            for i, sol in enumerate(solutions):
+                random.seed(SUITE_SEED + i)
+                puzzles.append(sg.make_puzzle_unique(sg.copy_grid(sol), cat)[0])
+        results[f"make_puzzle_unique/{cat}"] = {"per_sec": best_rate(make_all, n_make)}
+
+        def count_all():
+            for p in puzzles:
+                sg.count_solutions(sg.copy_grid(p))
+        results[f"count_solutions/{cat}"] = {"per_sec": best_rate(count_all, len(puzzles))}
+
+        pack = lambda: sg.generate_pack(cat, n_pack, seed_base=SUITE_SEED)
+        results[f"generate_pack/{cat}"] = {"per_sec": best_rate(pack, n_pack, rounds=1)}
+    return results
+
+def suite_urls(site) -> dict:
+    """Eén vaste url per route, gekozen uit de geladen data."""
+    data = site.get_data()
+    dates = data.date_index.visible_dates(site.get_today_iso())
+    if not dates:
+        raise SystemExit("Geen zichtbare datums in daily.json.")
+    d = dates[len(dates) // 2]
+    year, month = int(d[:4]), int(d[5:7])
+    cat = next((c for c in site.PACK_CATS if data.pack_max_id.get(c)), None)
+
+    urls = {
+        "home": "/",
+        "sudoku": f"/sudoku?date={d}",
+        "archief_jaren": "/archief",
+        "archief_maanden": f"/archief/{year}",
+        "archief_dagen": f"/archief/{year}/{month}",
+        "sitemap": "/sitemap.xml",
+        "sitemap_year": f"/sitemap-{year}.xml",
+        "print_puzzle": f"/print?date={d}",
+    }
+    if cat:
+        n = (data.pack_max_id[cat] + 1) // 2
+        urls["pack_view"] = f"/pack/{cat}/{n}"
+        urls["print_pack"] = f"/pack/{cat}/{n}/print"
+    return urls
+
+def bench_routes(requests: int = 300) -> dict:
+    """
+    Per route: requests/s met lege caches (cold, zoals de eerste hit na een
+    deploy of reload) en met warme caches, plus de allocatiepiek per cold request.
+    """
+    import tracemalloc
+    import app as site
+
+    client = site.app.test_client()
+
+    def clear_caches():
+        site.PAGE_CACHE.clear()
+        site.FRAGMENT_CACHE.clear()
+        site.SITEMAP_CACHE.clear()
+
+    results = {}
+    for name, url in suite_urls(site).items():
+        if client.get(url, buffered=True).status_code != 200:
+            raise SystemExit(f"{url} geeft geen 200")
+
+        def cold():
+            for _ in range(requests):
+                clear_caches()
+                client.get(url, buffered=True)
+
+        def warm():
+            for _ in range(requests):
+                client.get(url, buffered=True)
+
+        cold_rps = best_rate(cold, requests)
+        warm_rps = best_rate(warm, requests)
+
+        clear_caches()
+        client.get(url, buffered=True)  # lazy data (packs, archief) hoort niet bij de meting
+        tracemalloc.start()
+        peaks = []
+        for _ in range(20):
+            clear_caches()
+            tracemalloc.reset_peak()
+            client.get(url, buffered=True)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        results[name] = {
+            "url": url,
+            "cold_rps": cold_rps,
+            "warm_rps": warm_rps,
+            "alloc_kb": min(peaks) / 1024,
+        }
+    return results
+
+# metriek -> True als hoger beter is
+SUITE_METRICS = {"per_sec": True, "cold_rps": True, "warm_rps": True, "alloc_kb": False}
+
+def compare_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    """Lijst van (naam, metriek, baseline, nu) die meer dan tolerance slechter zijn."""
+    regressions = []
+    for group in ("generator", "web"):
+        for name, now in results.get(group, {}).items():
+            base = baseline.get(group, {}).get(name)
+            if not base:
+                continue
+            for metric, higher_better in SUITE_METRICS.items():
+                if metric not in now or not base.get(metric):
+                    continue
+                ratio = now[metric] / base[metric]
+                if (ratio < 1 - tolerance) if higher_better else (ratio > 1 + tolerance):
+                    regressions.append((f"{group}/{name}", metric, base[metric], now[metric]))
+    return regressions
+
+def run_suite(only: str, scale: float, requests: int) -> dict:
+    results = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "cpus": os.cpu_count(),
+            "seed": SUITE_SEED,
+            "scale": scale,
+            "requests": requests,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+    }
+    if only in ("all", "generator"):
+        results["generator"] = bench_generator(scale)
+    if only in ("all", "web"):
+        results["web"] = bench_routes(requests)
+    return results
+
+def print_suite(results: dict, baseline: dict):
+    base = baseline or {}
+    for name, r in results.get("generator", {}).items():
+        was = base.get("generator", {}).get(name, {}).get("per_sec")
+        print(f"{name:<28} {r['per_sec']:9.1f} puzzels/s" + (f"  (baseline {was:9.1f})" if was else ""))
+    for name, r in results.get("web", {}).items():
+        was = base.get("web", {}).get(name, {})
+        line = (f"{name:<28} cold {r['cold_rps']:7.0f} req/s, warm {r['warm_rps']:7.0f} req/s, "
+                f"alloc {r['alloc_kb']:7.1f} kB")
+        if was:
+            line += f"  (baseline {was.get('cold_rps', 0):.0f} / {was.get('warm_rps', 0):.0f} / {was.get('alloc_kb', 0):.1f})"
+        print(line)
+
+def main():
+    p = argparse.ArgumentParser(description="Micro-benchmarks voor de website (run vanuit de map met daily.json).")
+    sub = p.add_subparsers(dest="mode", required=True)
+
+    p_archive = sub.add_parser("archive", help="Archief-opvragingen bij groeiende daily.json")
+    p_archive.add_argument("--years", type=int, nargs="+", default=[1, 10, 50])
+    p_archive.add_argument("--repeat", type=int, default=2000)
+
+    p_startup = sub.add_parser("startup", help="Importtijd en uniek geheugen per worker, met en zonder preload")
+    p_startup.add_argument("--workers", type=int, default=2)
+
+    p_suite = sub.add_parser("suite", help="Generator en routes met vaste seeds, vergeleken met een baseline")
+    p_suite.add_argument("--only", choices=["all", "generator", "web"], default="all")
+    p_suite.add_argument("--scale", type=float, default=1.0, help="Schaal voor het aantal puzzels per meting")
+    p_suite.add_argument("--requests", type=int, default=300, help="Requests per route per ronde")
+    p_suite.add_argument("--out", default="bench_results.json", help="Resultaten als json")
+    p_suite.add_argument("--baseline", default=SUITE_BASELINE, help="Baseline om mee te vergelijken")
+    p_suite.add_argument("--save-baseline", action="store_true", help="Sla deze run op als nieuwe baseline")
+    p_suite.add_argument("--tolerance", type=float, default=0.25,
+                         help="Toegestane achteruitgang t.o.v. de baseline (0.25 = 25%%)")
+
+    p_probe = sub.add_parser("startup-probe", help=argparse.SUPPRESS)
+    p_probe.add_argument("--workers", type=int, default=2)
+    p_probe.add_argument("--preload", action="store_true")
+
+    args = p.parse_args()
+
+    if args.mode == "archive":
+        results = bench_archive(args.years, repeat=args.repeat)
+        for years, r in results.items():
+            print(f"{years:>3} jaar ({r['dates']:>6} datums): cache {r['cached_us']:7.2f} us, "
+                  f"zonder cache {r['rebuild_us']:9.1f} us, route {r['route_us']:7.1f} us")
+
+    elif args.mode == "startup":
+        for mode, r in bench_startup(args.workers).items():
+            print(f"{mode:>8}: import master {r['master_import_ms']:6.0f} ms, "
+                  f"worker {r['worker_import_ms']:6.0f} ms, uniek per worker {r['worker_private_mb']:6.1f} MB")
+
+    elif args.mode == "suite":
+        baseline = None
+        if not args.save_baseline:
+            if not os.path.exists(args.baseline):
+                # zonder baseline zou de regressiecheck stilletjes slagen
+                raise SystemExit(f"Baseline {args.baseline} bestaat niet; sla er een op met --save-baseline.")
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+
+        results = run_suite(args.only, args.scale, args.requests)
+        print_suite(results, baseline)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+        if args.save_baseline:
+            with open(args.baseline, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            print(f"Baseline opgeslagen in {args.baseline}.")
+        else:
+            regressions = compare_baseline(results, baseline, args.tolerance)
+            for name, metric, was, now in regressions:
+                print(f"REGRESSIE {name} {metric}: {was:.1f} -> {now:.1f}")
+            if regressions:
+                sys.exit(1)
+            print(f"Geen regressies t.o.v. {args.baseline} (tolerantie {args.tolerance:.0%}).")
+
+    elif args.mode == "startup-probe":
+        print(json.dumps(startup_probe(args.preload, args.workers)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Zet de site om naar statische HTML, zodat nginx het leeuwendeel kan serveren.
+
+Bestandsindeling onder --out (de query bepaalt de bestandsnaam; oplossingen alleen zonder size):
+  /sudoku?date=D              -> sudoku/D/index.html
+  /sudoku?date=D&size=S       -> sudoku/D/S.html        (idem groter en print)
+  /pack/C/N                   -> pack/C/N/index.html
+  /pack/C/N/groter?size=S     -> pack/C/N/groter/S.html (idem pack en print)
+
+Voorbeeld voor nginx (map $arg_size $frozen_size { "" index; default $arg_size; }):
+  location ~ ^/(sudoku|groter|oplossing|print)$ {
+      try_files /frozen$uri/$arg_date/$frozen_size.html @flask;
+  }
+  location /pack/ { try_files /frozen$uri/$frozen_size.html @flask; }
+
+Alleen wat niet meer verandert wordt bevroren: datums vóór vandaag en alle
+pack-pagina's. Vandaag, de homepage en het archief blijven bij Flask.
+Een volgende run rendert alleen nieuwe datums en nieuwe pack-ids (plus het
+vorige laatste pack-id, waar nu een "volgende" knop bij komt). Het manifest
+onthoudt ook mtime en grootte van daily.json en de packbestanden: is een
+bestand daarna gewijzigd, dan wordt dat deel opnieuw gerenderd, en bevroren
+pagina's die niet meer bestaan (een gekrompen pack, een weggehaalde datum)
+worden verwijderd.
+"""
+import argparse
+import json
+import os
+import shutil
+from functools import partial
+
+import app as site
+from sudoku_generator import ordered_map
+
+MANIFEST = ".frozen.json"
+DAILY_ROUTES = ["sudoku", "groter", "oplossing", "print"]
+PACK_ROUTES = ["", "/groter", "/oplossing", "/print"]
+
+# -----------------------------
+# Welke pagina's
+# -----------------------------
+def size_variants(route):
+    # zonder size (eigen canonical url) en met elke size expliciet; de oplossing kent geen size
+    if route.endswith("oplossing"):
+        return [None]
+    return [None] + list(site.SIZE_TO_CELL)
+
+def daily_jobs(dates):
+    jobs = []
+    for d in dates:
+        for route in DAILY_ROUTES:
+            for size in size_variants(route):
+                query = f"date={d}" + (f"&size={size}" if size else "")
+                jobs.append((f"/{route}?{query}", os.path.join(route, d, f"{size or 'index'}.html")))
+    return jobs
+
+def pack_jobs(cat, ids):
+    jobs = []
+    for n in ids:
+        for route in PACK_ROUTES:
+            path = f"/pack/{cat}/{n}{route}"
+            for size in size_variants(route):
+                url = path + (f"?size={size}" if size else "")
+                jobs.append((url, os.path.join(path.lstrip("/"), f"{size or 'index'}.html")))
+    return jobs
+
+def load_manifest(out_dir):
+    p = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(p):
+        return {}
+    with open(p, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def data_stamps(data):
+    """mtime/grootte van de databestanden achter deze snapshot, in JSON-vorm voor het manifest."""
+    stamps = {"daily": data.stamps[site.DAILY_PATH]}
+    for cat in site.PACK_CATS:
+        stamps[cat] = data.stamps[cat][1]
+    return {k: list(v) if v else None for k, v in stamps.items()}
+
+def stale_dirs(out_dir, settled, counts):
+    """Bevroren mappen van datums en pack-ids die niet meer in de data staan."""
+    stale = []
+    keep = set(settled)
+    for route in DAILY_ROUTES:
+        root = os.path.join(out_dir, route)
+        if os.path.isdir(root):
+            stale += [os.path.join(root, d) for d in sorted(os.listdir(root)) if d not in keep]
+    for cat in site.PACK_CATS:
+        root = os.path.join(out_dir, "pack", cat)
+        if os.path.isdir(root):
+            stale += [os.path.join(root, n) for n in sorted(os.listdir(root))
+                      if not n.isdigit() or not 1 <= int(n) <= counts[cat]]
+    return stale
+
+def plan(out_dir, base_url, force=False):
+    """
+    Lijst (url, bestand) die (opnieuw) gerenderd moet worden, de mappen die
+    weg moeten en het nieuwe manifest.
+    """
+    today = site.get_today_iso()
+    data = site.get_data()
+    settled = [d for d in data.date_index.visible_dates(today) if site.is_settled_daily(d, today)]
+    stamps = data_stamps(data)
+    counts = {cat: data.pack_max_id.get(cat, 0) for cat in site.PACK_CATS}
+
+    old = {} if force else load_manifest(out_dir)
+    if old.get("base_url") != base_url:
+        old = {}
+    old_stamps = old.get("stamps", {})
+
+    # daily.json gewijzigd: een oude puzzel kan anders zijn, dus alle datums opnieuw
+    done_until = old.get("daily_until", "") if old_stamps.get("daily") == stamps["daily"] else ""
+    jobs = daily_jobs([d for d in settled if d > done_until])
+
+    old_counts = old.get("packs", {})
+    for cat in site.PACK_CATS:
+        count = counts[cat]
+        prev = old_counts.get(cat, 0) if old_stamps.get(cat) == stamps[cat] else 0
+        if count != prev:
+            # het vorige laatste id krijgt nu een "volgende" knop; is het pack gekrompen, dan alles opnieuw
+            start = max(1, prev) if count > prev else 1
+            jobs += pack_jobs(cat, range(start, count + 1))
+
+    manifest = {
+        "base_url": base_url,
+        "daily_until": settled[-1] if settled else done_until,
+        "packs": counts,
+        "stamps": stamps,
+    }
+    return jobs, stale_dirs(out_dir, settled, counts), manifest
+
+# -----------------------------
+# Renderen
+# -----------------------------
+_CLIENT = {}
+
+def render_job(job, out_dir, base_url):
+    """Render één url via de gewone Flask-routes en schrijf hem atomisch weg."""
+    url, rel_path = job
+    client = _CLIENT.get(base_url)
+    if client is None:
+        client = _CLIENT[base_url] = site.app.test_client()
+    resp = client.get(url, base_url=base_url)
+    if resp.status_code != 200:
+        return f"{url}: {resp.status_code}"
+
+    path = os.path.join(out_dir, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(resp.get_data())
+    os.replace(tmp, path)
+    return None
+
+def freeze(out_dir, base_url, workers=1, force=False):
+    jobs, stale, manifest = plan(out_dir, base_url, force=force)
+    os.makedirs(out_dir, exist_ok=True)
+    for path in stale:
+        shutil.rmtree(path)
+    if stale:
+        print(f"{len(stale)} verouderde mappen verwijderd")
+
+    errors = []
+    with ordered_map(workers) as run:
+        for i, err in enumerate(run(partial(render_job, out_dir=out_dir, base_url=base_url), jobs), start=1):
+            if err:
+                errors.append(err)
+            if i % 5000 == 0:
+                print(f"Bevroren {i}/{len(jobs)}")
+
+    if errors:
+        # manifest niet bijwerken: de volgende run probeert het opnieuw
+        raise RuntimeError(f"{len(errors)} pagina's mislukt, bv. {errors[0]}")
+
+    p = os.path.join(out_dir, MANIFEST)
+    with open(p + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(p + ".tmp", p)
+    return len(jobs)
+
+def main():
+    p = argparse.ArgumentParser(description="Render de vaste pagina's van de site naar statische HTML.")
+    p.add_argument("--out", default="frozen", help="Doelmap")
+    p.add_argument("--base-url", default="https://dagelijksesudoku.nl",
+                   help="Host voor canonical/og:url in de pagina's")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Aantal processen")
+    p.add_argument("--force", action="store_true", help="Alles opnieuw renderen")
+    args = p.parse_args()
+
+    n = freeze(args.out, args.base_url, workers=args.workers, force=args.force)
+    print(f"Klaar! {n} pagina's gerenderd in {args.out}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+Gunicorn leest dit bestand vanzelf uit de werkmap (ook met --preload).
+Elke worker krijgt zijn eigen SIGHUP-handler voor het herladen van de data.
+"""
+
+def post_worker_init(worker):
+    # pas hier: gunicorn zet bij het starten van een worker alle signalen terug
+    import app
+    app.install_reload_signal()
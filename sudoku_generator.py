@@ -1,10 +1,19 @@
 #!/usr/bin/env python3
 import random
 import argparse
+import hashlib
 import json
+import mmap
+import os
+import struct
 import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
 from datetime import date, timedelta
-from typing import List, Optional, Tuple
+from functools import partial
+from itertools import combinations
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 Grid = List[List[int]]
 
@@ -34,7 +43,49 @@ def find_empty(grid: Grid) -> Optional[Tuple[int, int]]:
 def copy_grid(grid: Grid) -> Grid:
     return [row[:] for row in grid]
 
-def solve(grid: Grid) -> bool:
+# -----------------------------
+# Work budget
+# -----------------------------
+class NodeBudgetExceeded(TimeoutError):
+    """Het zoekbudget is op; subclass van TimeoutError zodat retries blijven werken."""
+
+
+class NodeBudget:
+    """
+    Telt zoeknodes over alle solver-aanroepen van één puzzel heen.
+    Anders dan een wall-clock limiet hangt het afbreekpunt niet af van de machine.
+    """
+    __slots__ = ("limit", "used")
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+
+    def spend(self) -> None:
+        self.used += 1
+        if self.used > self.limit:
+            raise NodeBudgetExceeded(f"Zoekbudget van {self.limit} nodes is op.")
+
+
+class GenStats:
+    """
+    Tellers voor het maken van puzzels (telemetrie): zoeknodes in de
+    uniciteitschecks, het aantal checks, geprobeerde en afgewezen verwijderingen.
+    Telt door over alle pogingen heen als hetzelfde object wordt meegegeven.
+    """
+    __slots__ = ("nodes", "checks", "removals", "rejected")
+
+    def __init__(self):
+        self.nodes = 0
+        self.checks = 0
+        self.removals = 0
+        self.rejected = 0
+
+    def as_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+# Oorspronkelijke backtracker; blijft bestaan als referentie voor de bitboard solver.
+def solve_naive(grid: Grid) -> bool:
     pos = find_empty(grid)
     if not pos:
         return True
@@ -44,15 +95,33 @@ def solve(grid: Grid) -> bool:
     for v in nums:
         if is_valid(grid, r, c, v):
             grid[r][c] = v
-            if solve(grid):
+            if solve_naive(grid):
                 return True
             grid[r][c] = 0
     return False
 
-# -----------------------------
-# Uniqueness check
-# -----------------------------
-def count_solutions(grid: Grid, limit: int = 2) -> int:
+def givens_valid(grid: Grid) -> bool:
+    """Geen cijfer twee keer in dezelfde rij, kolom of blok."""
+    for r in range(9):
+        for c in range(9):
+            v = grid[r][c]
+            if v:
+                grid[r][c] = 0
+                ok = is_valid(grid, r, c, v)
+                grid[r][c] = v
+                if not ok:
+                    return False
+    return True
+
+def count_solutions_naive(grid: Grid, limit: int = 2, budget: Optional[NodeBudget] = None) -> int:
+    # tegenstrijdige givens: geen oplossing, net als bij de bitboard- en DLX-teller
+    if not givens_valid(grid):
+        return 0
+    return _count_naive(grid, limit, budget)
+
+def _count_naive(grid: Grid, limit: int, budget: Optional[NodeBudget]) -> int:
+    if budget is not None:
+        budget.spend()
     pos = find_empty(grid)
     if not pos:
         return 1
@@ -61,18 +130,505 @@ def count_solutions(grid: Grid, limit: int = 2) -> int:
     for v in range(1, 10):
         if is_valid(grid, r, c, v):
             grid[r][c] = v
-            total += count_solutions(grid, limit)
-            grid[r][c] = 0
+            try:
+                total += _count_naive(grid, limit, budget)
+            finally:
+                grid[r][c] = 0
             if total >= limit:
                 return limit
     return total
 
+# -----------------------------
+# Bitboard solver
+# -----------------------------
+# Cellen 0..80; een cijfer v wordt als bit 1 << (v - 1) opgeslagen.
+FULL_MASK = 0x1FF
+
+CELL_ROW = [i // 9 for i in range(81)]
+CELL_COL = [i % 9 for i in range(81)]
+CELL_BOX = [(i // 27) * 3 + (i % 9) // 3 for i in range(81)]
+
+UNITS = (
+    [[r * 9 + c for c in range(9)] for r in range(9)]
+    + [[r * 9 + c for r in range(9)] for c in range(9)]
+    + [[(b // 3) * 27 + (b % 3) * 3 + (k // 3) * 9 + k % 3 for k in range(9)] for b in range(9)]
+)
+
+CELL_UNITS = [[UNITS[CELL_ROW[i]], UNITS[9 + CELL_COL[i]], UNITS[18 + CELL_BOX[i]]] for i in range(81)]
+
+PEERS = [
+    sorted({j for unit in CELL_UNITS[i] for j in unit} - {i})
+    for i in range(81)
+]
+PEER_MASK = [sum(1 << j for j in PEERS[i]) for i in range(81)]
+
+# dezelfde eenheden en peers als 81-bit celmaskers
+UNIT_MASKS = [sum(1 << j for j in unit) for unit in UNITS]
+CELL_UNIT_MASKS = [[UNIT_MASKS[CELL_ROW[i]], UNIT_MASKS[9 + CELL_COL[i]], UNIT_MASKS[18 + CELL_BOX[i]]] for i in range(81)]
+ALL_CELLS = (1 << 81) - 1
+
+POPCOUNT = [bin(m).count("1") for m in range(FULL_MASK + 1)]
+MASK_BITS = [[1 << k for k in range(9) if m & (1 << k)] for m in range(FULL_MASK + 1)]
+BIT_DIGIT = {1 << (v - 1): v for v in range(1, 10)}
+
+_DEAD = -2
+_SOLVED = -1
+
+
+class BitboardSolver:
+    """
+    Solver met kandidaat-bitmasks per rij, kolom en blok.
+    Vult naked en hidden singles in en splitst op de cel met de minste kandidaten.
+    """
+    __slots__ = ("cells", "rows", "cols", "boxes", "nodes", "budget")
+
+    def __init__(self, grid: Optional[Grid] = None, budget: Optional[NodeBudget] = None):
+        self.cells = [0] * 81
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.boxes = [0] * 9
+        self.nodes = 0
+        self.budget = budget
+        if grid is not None:
+            self.load(grid)
+
+    def load(self, grid: Grid) -> bool:
+        """Laad een grid; False als de givens elkaar al tegenspreken."""
+        cells, rows, cols, boxes = self.cells, self.rows, self.cols, self.boxes
+        for k in range(9):
+            rows[k] = cols[k] = boxes[k] = 0
+        ok = True
+        for i in range(81):
+            v = grid[i // 9][i % 9]
+            if not v:
+                cells[i] = 0
+                continue
+            bit = 1 << (v - 1)
+            r, c, b = CELL_ROW[i], CELL_COL[i], CELL_BOX[i]
+            if (rows[r] | cols[c] | boxes[b]) & bit:
+                ok = False
+            cells[i] = bit
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+        return ok
+
+    def write_back(self, grid: Grid) -> None:
+        cells = self.cells
+        for i in range(81):
+            grid[i // 9][i % 9] = BIT_DIGIT.get(cells[i], 0)
+
+    def place(self, i: int, bit: int) -> None:
+        self.cells[i] = bit
+        self.rows[CELL_ROW[i]] |= bit
+        self.cols[CELL_COL[i]] |= bit
+        self.boxes[CELL_BOX[i]] |= bit
+
+    def unplace(self, i: int) -> None:
+        keep = ~self.cells[i]
+        self.cells[i] = 0
+        self.rows[CELL_ROW[i]] &= keep
+        self.cols[CELL_COL[i]] &= keep
+        self.boxes[CELL_BOX[i]] &= keep
+
+    def _undo(self, trail: List[int]) -> None:
+        for i in reversed(trail):
+            self.unplace(i)
+
+    def candidates(self, i: int) -> int:
+        return FULL_MASK & ~(self.rows[CELL_ROW[i]] | self.cols[CELL_COL[i]] | self.boxes[CELL_BOX[i]])
+
+    def _hidden_singles(self, trail: List[int], cand: List[int]) -> int:
+        """
+        Vul hidden singles in; geeft aantal plaatsingen of _DEAD.
+        cand bevat de kandidaten van de vorige scan; die kunnen na een plaatsing
+        te ruim zijn, daarom wordt elke plaatsing opnieuw gecontroleerd.
+        """
+        cells = self.cells
+        placed = 0
+        for unit in UNITS:
+            once = twice = seen = 0
+            for i in unit:
+                v = cells[i]
+                if v:
+                    seen |= v
+                    continue
+                m = cand[i]
+                twice |= once & m
+                once |= m
+            if (once | seen) != FULL_MASK:
+                return _DEAD
+            hidden = once & ~twice & ~seen
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for i in unit:
+                    if not cells[i] and self.candidates(i) & bit:
+                        break
+                else:
+                    return _DEAD
+                self.place(i, bit)
+                trail.append(i)
+                placed += 1
+        return placed
+
+    def _propagate(self, trail: List[int]) -> int:
+        """
+        Vul alle singles in (vastgelegd in trail).
+        Geeft de cel met de minste kandidaten terug, _SOLVED of _DEAD.
+        """
+        cells, rows, cols, boxes = self.cells, self.rows, self.cols, self.boxes
+        cell_row, cell_col, cell_box, popcount = CELL_ROW, CELL_COL, CELL_BOX, POPCOUNT
+        cand = [0] * 81
+        while True:
+            best = _SOLVED
+            best_n = 10
+            placed = False
+            for i in range(81):
+                if cells[i]:
+                    continue
+                r, c, b = cell_row[i], cell_col[i], cell_box[i]
+                m = 0x1FF & ~(rows[r] | cols[c] | boxes[b])
+                if not m:
+                    return _DEAD
+                cand[i] = m
+                n = popcount[m]
+                if n == 1:
+                    cells[i] = m
+                    rows[r] |= m
+                    cols[c] |= m
+                    boxes[b] |= m
+                    trail.append(i)
+                    placed = True
+                elif n < best_n:
+                    best, best_n = i, n
+            if placed:
+                continue
+            if best == _SOLVED:
+                return _SOLVED
+            found = self._hidden_singles(trail, cand)
+            if found == _DEAD:
+                return _DEAD
+            if not found:
+                return best
+
+    def solve(self, rng=None) -> bool:
+        """Zoek één oplossing en laat die in de cellen staan. rng schudt de kandidaatvolgorde."""
+        self.nodes += 1
+        trail: List[int] = []
+        i = self._propagate(trail)
+        if i == _SOLVED:
+            return True
+        if i != _DEAD:
+            bits = MASK_BITS[self.candidates(i)]
+            if rng is not None:
+                bits = bits[:]
+                rng.shuffle(bits)
+            for bit in bits:
+                self.place(i, bit)
+                if self.solve(rng):
+                    return True
+                self.unplace(i)
+        self._undo(trail)
+        return False
+
+    def count(self, limit: int = 2) -> int:
+        """
+        Tel oplossingen tot en met limit; de cellen blijven ongewijzigd,
+        ook als het budget halverwege op raakt.
+        """
+        self.nodes += 1
+        trail: List[int] = []
+        try:
+            if self.budget is not None:
+                self.budget.spend()
+            i = self._propagate(trail)
+            if i == _SOLVED:
+                return 1
+            total = 0
+            if i != _DEAD:
+                for bit in MASK_BITS[self.candidates(i)]:
+                    self.place(i, bit)
+                    try:
+                        total += self.count(limit - total)
+                    finally:
+                        self.unplace(i)
+                    if total >= limit:
+                        break
+            return total
+        finally:
+            self._undo(trail)
+
+
+def solve(grid: Grid) -> bool:
+    solver = BitboardSolver()
+    if not solver.load(grid) or not solver.solve(random):
+        return False
+    solver.write_back(grid)
+    return True
+
+# -----------------------------
+# Uniqueness check
+# -----------------------------
+def count_solutions(grid: Grid, limit: int = 2, budget: Optional[NodeBudget] = None) -> int:
+    solver = BitboardSolver(budget=budget)
+    if not solver.load(grid):
+        return 0
+    return min(solver.count(limit), limit)
+
+# -----------------------------
+# Dancing Links (Algorithm X)
+# -----------------------------
+# Exact cover: 324 kolommen (cel, rij-cijfer, kolom-cijfer, blok-cijfer) en
+# 729 rijen (cel * 9 + cijfer - 1) van elk 4 nodes. Alle links staan in vaste
+# lijsten die één keer per proces worden opgebouwd; elke telling zet de
+# structuur na afloop weer precies terug.
+DLX_COLS = 324
+
+
+class DLXCounter:
+    __slots__ = ("L", "R", "U", "D", "C", "S", "given", "nodes", "budget")
+
+    def __init__(self):
+        total = 1 + DLX_COLS + 729 * 4
+        L = [0] * total
+        R = [0] * total
+        U = list(range(total))
+        D = list(range(total))
+        C = list(range(total))
+        S = [0] * (DLX_COLS + 1)
+
+        for h in range(DLX_COLS + 1):
+            L[h] = h - 1 if h > 0 else DLX_COLS
+            R[h] = h + 1 if h < DLX_COLS else 0
+
+        for row in range(729):
+            cell, d = divmod(row, 9)
+            cols = (
+                1 + cell,
+                1 + 81 + CELL_ROW[cell] * 9 + d,
+                1 + 162 + CELL_COL[cell] * 9 + d,
+                1 + 243 + CELL_BOX[cell] * 9 + d,
+            )
+            base = 1 + DLX_COLS + row * 4
+            for k, col in enumerate(cols):
+                x = base + k
+                C[x] = col
+                L[x] = base + (k - 1) % 4
+                R[x] = base + (k + 1) % 4
+                U[x] = U[col]
+                D[x] = col
+                D[U[col]] = x
+                U[col] = x
+                S[col] += 1
+
+        self.L, self.R, self.U, self.D, self.C, self.S = L, R, U, D, C, S
+        self.given = [0] * 81  # stapel met geselecteerde given-nodes
+        self.nodes = 0
+        self.budget: Optional[NodeBudget] = None
+
+    def _cover(self, c: int) -> None:
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def _uncover(self, c: int) -> None:
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[c]] = c
+        L[R[c]] = c
+
+    def _select(self, x: int) -> None:
+        R, C = self.R, self.C
+        self._cover(C[x])
+        j = R[x]
+        while j != x:
+            self._cover(C[j])
+            j = R[j]
+
+    def _deselect(self, x: int) -> None:
+        L, C = self.L, self.C
+        j = L[x]
+        while j != x:
+            self._uncover(C[j])
+            j = L[j]
+        self._uncover(C[x])
+
+    def _search(self, limit: int) -> int:
+        self.nodes += 1
+        if self.budget is not None:
+            self.budget.spend()
+        R, D, S = self.R, self.D, self.S
+        c = R[0]
+        if c == 0:
+            return 1
+        best, best_s = c, S[c]
+        c = R[c]
+        while c and best_s > 1:
+            if S[c] < best_s:
+                best, best_s = c, S[c]
+            c = R[c]
+        if best_s == 0:
+            return 0
+
+        # try/finally zodat een afgebroken zoektocht de links toch herstelt
+        total = 0
+        self._cover(best)
+        try:
+            r = D[best]
+            while r != best:
+                j = R[r]
+                while j != r:
+                    self._cover(self.C[j])
+                    j = R[j]
+                try:
+                    total += self._search(limit - total)
+                finally:
+                    j = self.L[r]
+                    while j != r:
+                        self._uncover(self.C[j])
+                        j = self.L[j]
+                if total >= limit:
+                    break
+                r = D[r]
+        finally:
+            self._uncover(best)
+        return total
+
+    def count(self, grid: Grid, limit: int = 2, budget: Optional[NodeBudget] = None) -> int:
+        R, L, C, given = self.R, self.L, self.C, self.given
+        self.budget = budget
+        n_given = 0
+        total = 0
+        conflict = False
+        for i in range(81):
+            v = grid[i // 9][i % 9]
+            if not v:
+                continue
+            x = 1 + DLX_COLS + (i * 9 + v - 1) * 4
+            # een al afgedekte kolom betekent dat twee givens botsen
+            for k in range(4):
+                col = C[x + k]
+                if R[L[col]] != col:
+                    conflict = True
+                    break
+            if conflict:
+                break
+            self._select(x)
+            given[n_given] = x
+            n_given += 1
+
+        try:
+            if not conflict:
+                total = self._search(limit)
+        finally:
+            self.budget = None
+            while n_given:
+                n_given -= 1
+                self._deselect(given[n_given])
+        return min(total, limit)
+
+
+_DLX: Optional[DLXCounter] = None
+
+def count_solutions_dlx(grid: Grid, limit: int = 2, budget: Optional[NodeBudget] = None) -> int:
+    global _DLX
+    if _DLX is None:
+        _DLX = DLXCounter()
+    return _DLX.count(grid, limit, budget)
+
+COUNT_BACKENDS = {
+    "bitboard": count_solutions,
+    "dlx": count_solutions_dlx,
+    "naive": count_solutions_naive,
+}
+
 def generate_solution(seed: int) -> Grid:
     random.seed(seed)
     grid = [[0] * 9 for _ in range(9)]
     solve(grid)
     return grid
 
+# -----------------------------
+# Snelle oplossingsgrids
+# -----------------------------
+# sample_solution vult de drie diagonale blokken (die geen rij, kolom of blok
+# delen) elk met een willekeurige permutatie en laat de bitboard solver de rest
+# invullen. Dat scheelt het grootste deel van de zoektocht vanaf een leeg grid en
+# raakt de globale random-staat niet: alle toeval komt uit de meegegeven rng.
+#
+# Reproduceerbaarheid: StableRandom gebruikt alleen random(), en Python garandeert
+# dat random() voor dezelfde (int-)seed op elke versie en elk platform dezelfde
+# reeks geeft; voor shuffle en randint geldt die garantie niet. Dezelfde seed
+# geeft dus overal hetzelfde grid (en met make_puzzle_unique(rng=...) dezelfde
+# puzzel), zolang SAMPLER_VERSION gelijk blijft. Een wijziging die de uitkomst
+# verandert (ook in de solver) moet SAMPLER_VERSION en SAMPLER_GOLDEN ophogen;
+# sampler-check vangt het als dat vergeten is.
+SAMPLER_VERSION = 1
+SAMPLER_GOLDEN = "a329dde38cfc5230"  # sha256 (16 hex) van de grids voor seeds 0..19
+SOLUTION_SAMPLERS = ("backtrack", "fast")
+_DIAGONAL_BOXES = [[r * 9 + c for r in range(b, b + 3) for c in range(b, b + 3)] for b in (0, 3, 6)]
+
+class StableRandom(random.Random):
+    """random.Random waarvan shuffle en randint alleen op random() leunen (zie boven)."""
+
+    def shuffle(self, x) -> None:
+        for i in range(len(x) - 1, 0, -1):
+            j = int(self.random() * (i + 1))
+            x[i], x[j] = x[j], x[i]
+
+    def randint(self, a: int, b: int) -> int:
+        return a + int(self.random() * (b - a + 1))
+
+def sample_solution(rng: random.Random) -> Grid:
+    """Willekeurig volledig grid; alle toeval komt uit rng."""
+    while True:
+        grid = [[0] * 9 for _ in range(9)]
+        for box in _DIAGONAL_BOXES:
+            digits = list(range(1, 10))
+            rng.shuffle(digits)
+            for i, v in zip(box, digits):
+                grid[i // 9][i % 9] = v
+        solver = BitboardSolver(grid)
+        if solver.solve(rng):
+            solver.write_back(grid)
+            return grid
+
+def new_solution(seed: int, sampler: str = "backtrack"):
+    """
+    (oplossing, rng) voor één poging; rng dient daarna ook voor make_puzzle_unique.
+    "backtrack" is het oorspronkelijke pad via de globale random, zodat bestaande
+    seeds dezelfde puzzels blijven geven; "fast" gebruikt sample_solution met een
+    eigen StableRandom(seed).
+    """
+    if sampler == "fast":
+        rng = StableRandom(seed)
+        return sample_solution(rng), rng
+    if sampler != "backtrack":
+        raise ValueError(f"Onbekende sampler: {sampler}")
+    return generate_solution(seed), random
+
+def sampler_golden(count: int = 20) -> str:
+    grids = "".join(grid_to_str(sample_solution(StableRandom(seed))) for seed in range(count))
+    return hashlib.sha256(grids.encode("ascii")).hexdigest()[:16]
+
 # -----------------------------
 # Difficulty settings (clues visible)
 # -----------------------------
@@ -86,38 +642,725 @@ DIFFICULTY_CLUES = {
 def grid_to_str(grid: Grid) -> str:
     return "".join(str(grid[r][c]) for r in range(9) for c in range(9))
 
-def make_puzzle_unique(solution: Grid, difficulty: str, time_limit_sec: float = 1.25) -> Tuple[Grid, int]:
+# Zoeknodes per puzzel (over alle uniciteitschecks samen). Gemeten mediaan voor
+# extreem: ~90 (bitboard, gepakte zoektocht) en ~3500 (dlx); de limiet vangt alleen
+# uitschieters af.
+DEFAULT_NODE_BUDGET = {
+    "bitboard": 5_000,
+    "dlx": 50_000,
+    "naive": 2_000_000,
+}
+
+def make_puzzle_unique(solution: Grid, difficulty: str, time_limit_sec: Optional[float] = None,
+                       solver: str = "bitboard", node_budget: Optional[int] = None,
+                       stats: Optional[GenStats] = None, rng=None) -> Tuple[Grid, int]:
     """
     Maak een puzzel met unieke oplossing.
-    time_limit_sec voorkomt dat één puzzel eindeloos blijft hangen.
+    node_budget (standaard DEFAULT_NODE_BUDGET[solver]) voorkomt dat één puzzel eindeloos
+    blijft hangen en geeft per seed altijd dezelfde uitkomst; time_limit_sec is een
+    optionele extra wall-clock limiet.
+    solver kiest de backend uit COUNT_BACKENDS voor de uniciteitscheck.
+    stats (optioneel) telt nodes, checks en verwijderingen mee, ook bij een timeout.
+    rng (standaard de globale random) kiest het aantal clues en de volgorde van de cellen.
     """
     start_t = time.time()
+    counter = COUNT_BACKENDS[solver]
+    if node_budget is None:
+        node_budget = DEFAULT_NODE_BUDGET[solver]
+    budget = NodeBudget(node_budget)
 
-    grid = copy_grid(solution)
     lo, hi = DIFFICULTY_CLUES[difficulty]
-    target = random.randint(lo, hi)
+    if rng is None:
+        rng = random
+    target = rng.randint(lo, hi)
 
     cells = [(r, c) for r in range(9) for c in range(9)]
-    random.shuffle(cells)
+    rng.shuffle(cells)
+
+    if stats is None:
+        stats = GenStats()
+    try:
+        if solver == "bitboard":
+            return _remove_clues_incremental(solution, cells, target, budget, start_t, time_limit_sec, stats)
+
+        grid = copy_grid(solution)
+        clues = 81
+        for r, c in cells:
+            if time_limit_sec is not None and time.time() - start_t > time_limit_sec:
+                raise TimeoutError("Puzzle generation took too long (time limit reached).")
+
+            if clues <= target:
+                break
+
+            backup = grid[r][c]
+            grid[r][c] = 0
+            stats.removals += 1
+            stats.checks += 1
+
+            test = copy_grid(grid)
+            if counter(test, limit=2, budget=budget) != 1:
+                grid[r][c] = backup
+                stats.rejected += 1
+            else:
+                clues -= 1
+
+        return grid, clues
+    finally:
+        stats.nodes += budget.used
+
+def unavoidable_sets(solution: Grid) -> List[int]:
+    """
+    Onvermijdbare verzamelingen (als 81-bit celmasker) van twee cijfers: verwissel je
+    a en b binnen zo'n gesloten component, dan blijft het grid geldig. Een unieke
+    puzzel moet dus in elke verzameling minstens één clue houden.
+    """
+    # per cijfer: de kolom in elke rij, de rij in elke kolom en de rij in elk blok
+    col_of = [[0] * 9 for _ in range(10)]
+    row_of = [[0] * 9 for _ in range(10)]
+    box_row = [[0] * 9 for _ in range(10)]
+    for r in range(9):
+        for c, v in enumerate(solution[r]):
+            col_of[v][r] = c
+            row_of[v][c] = r
+            box_row[v][r // 3 * 3 + c // 3] = r
+
+    sets = []
+    for a in range(1, 10):
+        ca, ra, ba = col_of[a], row_of[a], box_row[a]
+        for b in range(a + 1, 10):
+            cb, bb = col_of[b], box_row[b]
+            # rij en kolom: van de a en b in rij r naar de a in de kolom van die b;
+            # dat geeft cycli over de rijen
+            label = [-1] * 9
+            comps = []
+            for r in range(9):
+                if label[r] < 0:
+                    k = len(comps)
+                    mask = 0
+                    x = r
+                    while label[x] < 0:
+                        label[x] = k
+                        mask |= (1 << (9 * x + ca[x])) | (1 << (9 * x + cb[x]))
+                        x = ra[cb[x]]
+                    comps.append(mask)
+            # blok: staan de a en de b van één blok in verschillende cycli, dan horen die samen
+            if len(comps) > 1:
+                for k in range(9):
+                    x, y = label[ba[k]], label[bb[k]]
+                    if x != y:
+                        comps[x] |= comps[y]
+                        comps[y] = 0
+                        label = [x if l == y else l for l in label]
+            sets.extend(m for m in comps if m)
+
+    return sets
+
+
+# Uniciteitschecks voor ClueRemover op één int van 9 x 81 bits: bit 81 * d + i
+# staat aan als cijfer d + 1 nog in lege cel i kan. Naked singles zijn een telling
+# over de negen planes, hidden singles een telling per eenheid, voor alle cijfers
+# en eenheden tegelijk. Een eenheid is steeds 3 x 3 posities (een rij: 3 groepjes
+# van 3 naast elkaar), dus tellen gaat in twee stappen van drie verschuivingen.
+def _spread(mask: int) -> int:
+    """Een 81-bit celmasker in alle negen planes."""
+    return sum(mask << (81 * d) for d in range(9))
+
+PLANES = _spread(1)
+# ankers: de eerste cel van elke rij, kolom en blok, in elke plane
+ROW_ANCHORS = _spread(sum(1 << (9 * r) for r in range(9)))
+COL_ANCHORS = _spread(FULL_MASK)
+BOX_ANCHORS = _spread(sum(1 << UNITS[18 + b][0] for b in range(9)))
+
+def _unit_at(kind: int) -> Dict[int, int]:
+    """Per bitpositie van een anker (kind 0/1/2: rij/kolom/blok): die eenheid in dezelfde plane."""
+    return {81 * d + UNITS[9 * kind + u][0]: UNIT_MASKS[9 * kind + u] << (81 * d)
+            for d in range(9) for u in range(9)}
+
+# (ankers, stap binnen een groepje van 3, stap tussen de groepjes, eenheid per anker)
+HIDDEN_SCANS = (
+    (ROW_ANCHORS, 1, 3, _unit_at(0)),
+    (COL_ANCHORS, 9, 27, _unit_at(1)),
+    (BOX_ANCHORS, 1, 9, _unit_at(2)),
+)
+# cijfer d in cel i zetten: cel i uit alle planes, de peers uit plane d
+PLACE_KEEP = [~((PEER_MASK[q % 81] << (q - q % 81)) | _spread(1 << (q % 81))) for q in range(729)]
+PEERS_OF_BIT = {1 << i: PEER_MASK[i] for i in range(81)}
+
+def _packed_propagate(cand: int, empty: int):
+    """
+    Vul naked en hidden singles in. Geeft de nieuwe (cand, empty) terug, of None
+    als een lege cel geen kandidaat meer heeft of twee singles botsen.
+    """
+    keep = PLACE_KEEP
+    while empty:
+        # per cel: minstens één (ones) en minstens twee (twos) kandidaten
+        b = cand >> 81
+        c = cand >> 162
+        ones = cand | b | c
+        twos = (cand & b) | (c & (cand | b))
+        b = ones >> 243
+        c = ones >> 486
+        twos = (twos | (twos >> 243) | (twos >> 486) | (ones & b) | (c & (ones | b))) & ALL_CELLS
+        ones = (ones | b | c) & ALL_CELLS
+        if empty & ~ones:
+            return None
+        singles = ones & ~twos
+        if singles:
+            placed = cand & (singles * PLANES)
+            while placed:
+                b = placed & -placed
+                placed ^= b
+                if not cand & b:
+                    # twee naked singles met hetzelfde cijfer in één eenheid
+                    return None
+                cand &= keep[b.bit_length() - 1]
+            empty &= ~singles
+            continue
+
+        placed = False
+        for anchors, s1, s2, unit_at in HIDDEN_SCANS:
+            b = cand >> s1
+            c = cand >> (2 * s1)
+            ones = cand | b | c
+            twos = (cand & b) | (c & (cand | b))
+            b = ones >> s2
+            c = ones >> (2 * s2)
+            twos |= (twos >> s2) | (twos >> (2 * s2)) | (ones & b) | (c & (ones | b))
+            ones |= b | c
+            hidden = ones & ~twos & anchors
+            while hidden:
+                a = hidden & -hidden
+                hidden ^= a
+                # na een eerdere plaatsing kan het cijfer hier al weg zijn
+                x = cand & unit_at[a.bit_length() - 1]
+                if x:
+                    q = x.bit_length() - 1
+                    cand &= keep[q]
+                    empty &= ~(1 << (q % 81))
+                    placed = True
+        if not placed:
+            break
+    return cand, empty
+
+def _packed_solvable(cand: int, empty: int, budget: Optional[NodeBudget]) -> bool:
+    """Heeft deze stand een oplossing? Splitst op een cel met twee kandidaten als die er is."""
+    if budget is not None:
+        budget.spend()
+    state = _packed_propagate(cand, empty)
+    if state is None:
+        return False
+    cand, empty = state
+    if not empty:
+        return True
+    # zoals in _packed_propagate, maar ook tellen tot drie: cellen met precies twee kandidaten
+    b = cand >> 81
+    c = cand >> 162
+    ones = cand | b | c
+    twos = (cand & b) | (c & (cand | b))
+    threes = cand & b & c
+    o2, t2, h2 = ones >> 243, twos >> 243, threes >> 243
+    o3, t3, h3 = ones >> 486, twos >> 486, threes >> 486
+    threes |= h2 | h3 | (twos & (o2 | o3)) | (t2 & (ones | o3)) | (t3 & (ones | o2)) | (ones & o2 & o3)
+    twos |= t2 | t3 | (ones & o2) | (o3 & (ones | o2))
+    pair = twos & ~threes & ALL_CELLS
+    i = ((pair & -pair) if pair else (empty & -empty)).bit_length() - 1
+    for q in range(i, 729, 81):
+        if cand >> q & 1:
+            if _packed_solvable(cand & PLACE_KEEP[q], empty & ~(1 << i), budget):
+                return True
+    return False
+
+
+class ClueRemover:
+    """
+    Verwijdert clues uit een bekende oplossing en houdt de staat tussen
+    verwijderingen vast. Omdat de puzzel vóór elke stap uniek is, moet een tweede
+    oplossing afwijken in de cel die net leeg is: één zoektocht op de cijferplanes
+    met het bekende cijfer in die cel uitgesloten. Geforceerde cellen gaan er zonder
+    zoektocht uit, en een verwijdering die een onvermijdbare verzameling leeg maakt
+    wordt meteen afgewezen.
+    """
+    __slots__ = ("grid", "digit", "has", "blocked", "clue_mask", "sets_by_cell", "budget", "stats")
+
+    def __init__(self, solution: Grid, budget: Optional[NodeBudget] = None, stats: Optional[GenStats] = None):
+        self.grid = solution
+        self.digit = [solution[i // 9][i % 9] - 1 for i in range(81)]
+        # has: clues per cijfer; blocked: per plane de peers daarvan (daar kan dat cijfer niet meer)
+        self.has = [0] * 9
+        for i, d in enumerate(self.digit):
+            self.has[d] |= 1 << i
+        self.blocked = 0
+        for d, h in enumerate(self.has):
+            self.blocked |= self._blocked(h) << (81 * d)
+        self.clue_mask = ALL_CELLS
+        self.budget = budget
+        self.stats = stats if stats is not None else GenStats()
+        # pas opgebouwd bij de eerste cel die niet geforceerd is
+        self.sets_by_cell: Optional[List[List[int]]] = None
+
+    @staticmethod
+    def _blocked(h: int) -> int:
+        blocked = 0
+        peers = PEERS_OF_BIT
+        while h:
+            b = h & -h
+            h ^= b
+            blocked |= peers[b]
+        return blocked
+
+    def try_remove(self, i: int) -> bool:
+        """Haal de clue in cel i weg als de puzzel uniek blijft; anders blijft hij staan."""
+        bit = 1 << i
+        d = self.digit[i]
+        shift = 81 * d
+        rest = self.clue_mask ^ bit
+        empty = ALL_CELLS ^ rest
+        plane = self._blocked(self.has[d] ^ bit)
+        blocked = self.blocked & ~(ALL_CELLS << shift) | (plane << shift)
+        self.stats.removals += 1
+
+        # naked single: geen ander cijfer past; hidden single: d past nergens anders in een eenheid van i
+        forced = (blocked >> i) & PLANES | (1 << shift) == PLANES
+        if not forced:
+            free = empty & ~plane
+            for u in CELL_UNIT_MASKS[i]:
+                if free & u == bit:
+                    forced = True
+                    break
+        if not forced:
+            if self.sets_by_cell is None:
+                self.sets_by_cell = [[] for _ in range(81)]
+                for u in unavoidable_sets(self.grid):
+                    # alle 18 cellen van twee cijfers: alleen leeg als beide cijfers
+                    # ontbreken, en dat vindt de zoektocht ook
+                    if bin(u).count("1") == 18:
+                        continue
+                    m = u
+                    while m:
+                        b = m & -m
+                        m ^= b
+                        self.sets_by_cell[b.bit_length() - 1].append(u)
+            for u in self.sets_by_cell[i]:
+                if not u & rest:
+                    self.stats.rejected += 1
+                    return False
+
+            # alle lege cellen met hun kandidaten, zonder het bekende cijfer in cel i
+            cand = (empty * PLANES) & ~blocked
+            self.stats.checks += 1
+            if _packed_solvable(cand ^ (1 << (shift + i)), empty, self.budget):
+                self.stats.rejected += 1
+                return False
+
+        self.clue_mask = rest
+        self.has[d] ^= bit
+        self.blocked = blocked
+        return True
+
+    def puzzle(self) -> Grid:
+        grid = [[0] * 9 for _ in range(9)]
+        for i in range(81):
+            if self.clue_mask >> i & 1:
+                grid[i // 9][i % 9] = self.digit[i] + 1
+        return grid
+
+def _remove_clues_incremental(solution: Grid, cells: List[Tuple[int, int]], target: int,
+                              budget: NodeBudget, start_t: float,
+                              time_limit_sec: Optional[float],
+                              stats: Optional[GenStats] = None) -> Tuple[Grid, int]:
+    """
+    Zelfde verwijderlus als hierboven, maar via ClueRemover.
+    Levert voor dezelfde celvolgorde exact dezelfde puzzel op.
+    """
+    state = ClueRemover(solution, budget=budget, stats=stats)
 
     clues = 81
     for r, c in cells:
-        if time.time() - start_t > time_limit_sec:
+        if time_limit_sec is not None and time.time() - start_t > time_limit_sec:
             raise TimeoutError("Puzzle generation took too long (time limit reached).")
 
         if clues <= target:
             break
 
-        backup = grid[r][c]
-        grid[r][c] = 0
+        if state.try_remove(r * 9 + c):
+            clues -= 1
 
-        test = copy_grid(grid)
-        if count_solutions(test, limit=2) != 1:
-            grid[r][c] = backup
+    return state.puzzle(), clues
+
+# -----------------------------
+# Grading (menselijke technieken)
+# -----------------------------
+# Van makkelijk naar moeilijk; de grade van een puzzel is de zwaarste techniek
+# die nodig was. "backtracking" betekent dat logica alleen niet genoeg was.
+GRADES = (
+    "naked_single",
+    "hidden_single",
+    "locked_candidates",
+    "naked_pair",
+    "hidden_pair",
+    "naked_triple",
+    "hidden_triple",
+    "x_wing",
+    "swordfish",
+    "xy_wing",
+    "chain",
+    "backtracking",
+)
+
+# rij- en kolomposities binnen een blok (k = 3 * rr + cc)
+_BOX_ROW_POS = [0b111 << (3 * rr) for rr in range(3)]
+_BOX_COL_POS = [0b001001001 << cc for cc in range(3)]
+
+
+class Grader:
+    """
+    Lost een puzzel op met alleen logische technieken en onthoudt de zwaarste.
+    Kandidaten staan als bitmask per cel (dezelfde codering als BitboardSolver).
+    """
+    __slots__ = ("cand", "values", "empty", "hardest")
+
+    def __init__(self, puzzle: str):
+        self.cand = [FULL_MASK] * 81
+        self.values = [0] * 81
+        self.empty = 81
+        self.hardest = 0
+        for i, ch in enumerate(puzzle):
+            if ch != "0":
+                self._assign(i, 1 << (int(ch) - 1))
+
+    def _assign(self, i: int, bit: int) -> None:
+        cand = self.cand
+        if not cand[i] & bit:
+            raise ValueError("Puzzel is tegenstrijdig.")
+        cand[i] = 0
+        self.values[i] = bit
+        self.empty -= 1
+        for j in PEERS[i]:
+            cand[j] &= ~bit
+
+    def _eliminate(self, cells, bits: int) -> bool:
+        cand = self.cand
+        changed = False
+        for j in cells:
+            if cand[j] & bits:
+                cand[j] &= ~bits
+                changed = True
+        return changed
+
+    def _positions(self, unit: List[int]) -> List[int]:
+        """Per cijfer (0..8) een 9-bit masker van de posities in de eenheid."""
+        pos = [0] * 9
+        cand = self.cand
+        for k, i in enumerate(unit):
+            for bit in MASK_BITS[cand[i]]:
+                pos[bit.bit_length() - 1] |= 1 << k
+        return pos
+
+    # -- technieken: elk geeft True als er iets is ingevuld of weggestreept --
+
+    def naked_single(self) -> bool:
+        cand = self.cand
+        found = False
+        for i in range(81):
+            m = cand[i]
+            if m and POPCOUNT[m] == 1:
+                self._assign(i, m)
+                found = True
+        return found
+
+    def hidden_single(self) -> bool:
+        cand = self.cand
+        for unit in UNITS:
+            once = twice = 0
+            for i in unit:
+                m = cand[i]
+                twice |= once & m
+                once |= m
+            hidden = once & ~twice
+            for bit in MASK_BITS[hidden]:
+                for i in unit:
+                    if cand[i] & bit:
+                        self._assign(i, bit)
+                        return True
+        return False
+
+    def locked_candidates(self) -> bool:
+        changed = False
+        # pointing: cijfer zit in een blok alleen op één rij of kolom
+        for b in range(9):
+            box = UNITS[18 + b]
+            for d, pm in enumerate(self._positions(box)):
+                if not pm:
+                    continue
+                bit = 1 << d
+                for t in range(3):
+                    if not pm & ~_BOX_ROW_POS[t]:
+                        line = UNITS[CELL_ROW[box[3 * t]]]
+                    elif not pm & ~_BOX_COL_POS[t]:
+                        line = UNITS[9 + CELL_COL[box[t]]]
+                    else:
+                        continue
+                    changed |= self._eliminate([j for j in line if CELL_BOX[j] != b], bit)
+        # claiming: cijfer zit in een rij of kolom alleen binnen één blok
+        for u in range(18):
+            line = UNITS[u]
+            for d, pm in enumerate(self._positions(line)):
+                for t in range(3):
+                    if pm and not pm & ~(0b111 << (3 * t)):
+                        b = CELL_BOX[line[3 * t]]
+                        changed |= self._eliminate([j for j in UNITS[18 + b] if j not in line], 1 << d)
+        return changed
+
+    def _naked_subset(self, n: int) -> bool:
+        cand = self.cand
+        for unit in UNITS:
+            cells = [i for i in unit if cand[i] and POPCOUNT[cand[i]] <= n]
+            for combo in combinations(cells, n):
+                union = 0
+                for i in combo:
+                    union |= cand[i]
+                if POPCOUNT[union] == n:
+                    if self._eliminate([j for j in unit if j not in combo], union):
+                        return True
+        return False
+
+    def _hidden_subset(self, n: int) -> bool:
+        for unit in UNITS:
+            pos = self._positions(unit)
+            digits = [d for d in range(9) if pos[d] and POPCOUNT[pos[d]] <= n]
+            for combo in combinations(digits, n):
+                where = 0
+                keep = 0
+                for d in combo:
+                    where |= pos[d]
+                    keep |= 1 << d
+                if POPCOUNT[where] == n:
+                    cells = [unit[k] for k in range(9) if where >> k & 1]
+                    if self._eliminate(cells, FULL_MASK & ~keep):
+                        return True
+        return False
+
+    def naked_pair(self) -> bool:
+        return self._naked_subset(2)
+
+    def hidden_pair(self) -> bool:
+        return self._hidden_subset(2)
+
+    def naked_triple(self) -> bool:
+        return self._naked_subset(3)
+
+    def hidden_triple(self) -> bool:
+        return self._hidden_subset(3)
+
+    def _fish(self, n: int) -> bool:
+        line_pos = [self._positions(UNITS[u]) for u in range(18)]
+        for d in range(9):
+            bit = 1 << d
+            # basis in rijen en dekking in kolommen, en andersom
+            for base, cover in ((0, 9), (9, 0)):
+                pos = [line_pos[base + k][d] for k in range(9)]
+                lines = [k for k in range(9) if pos[k] and POPCOUNT[pos[k]] <= n]
+                for combo in combinations(lines, n):
+                    where = 0
+                    for k in combo:
+                        where |= pos[k]
+                    if POPCOUNT[where] != n:
+                        continue
+                    inside = {j for k in combo for j in UNITS[base + k]}
+                    cells = [j for t in range(9) if where >> t & 1
+                             for j in UNITS[cover + t] if j not in inside]
+                    if self._eliminate(cells, bit):
+                        return True
+        return False
+
+    def x_wing(self) -> bool:
+        return self._fish(2)
+
+    def swordfish(self) -> bool:
+        return self._fish(3)
+
+    def xy_wing(self) -> bool:
+        cand = self.cand
+        bivalue = [i for i in range(81) if cand[i] and POPCOUNT[cand[i]] == 2]
+        for pivot in bivalue:
+            pm = cand[pivot]
+            wings = [i for i in bivalue if PEER_MASK[pivot] >> i & 1
+                     and POPCOUNT[cand[i] & pm] == 1]
+            for a, b in combinations(wings, 2):
+                ma, mb = cand[a], cand[b]
+                z = ma & mb & ~pm
+                if not z or (ma & pm) == (mb & pm) or POPCOUNT[z] != 1:
+                    continue
+                common = PEER_MASK[a] & PEER_MASK[b]
+                if self._eliminate([j for j in range(81) if common >> j & 1], z):
+                    return True
+        return False
+
+    def chain(self) -> bool:
+        """Simple coloring: ketens van conjugate pairs per cijfer."""
+        cand = self.cand
+        for d in range(9):
+            bit = 1 << d
+            links = {}
+            for unit in UNITS:
+                cells = [i for i in unit if cand[i] & bit]
+                if len(cells) == 2:
+                    a, b = cells
+                    links.setdefault(a, []).append(b)
+                    links.setdefault(b, []).append(a)
+
+            color = {}
+            for start in links:
+                if start in color:
+                    continue
+                color[start] = 0
+                comp = [start]
+                todo = [start]
+                while todo:
+                    x = todo.pop()
+                    for y in links[x]:
+                        if y not in color:
+                            color[y] = 1 - color[x]
+                            comp.append(y)
+                            todo.append(y)
+                if len(comp) < 4:
+                    continue
+                sides = [[i for i in comp if color[i] == c] for c in (0, 1)]
+                masks = [sum(1 << i for i in side) for side in sides]
+                # color wrap: twee cellen van dezelfde kleur zien elkaar
+                for c in (0, 1):
+                    if any(PEER_MASK[i] & masks[c] for i in sides[c]) and self._eliminate(sides[c], bit):
+                        return True
+                # color trap: een andere cel ziet beide kleuren
+                trapped = [j for j in range(81) if cand[j] & bit and j not in color
+                           and PEER_MASK[j] & masks[0] and PEER_MASK[j] & masks[1]]
+                if self._eliminate(trapped, bit):
+                    return True
+        return False
+
+    def placements(self, max_level: int = len(GRADES) - 2) -> Iterator[Tuple[str, int, int]]:
+        """
+        Pas technieken toe (lichtste eerst, zoals run) en lever elke ingevulde cel
+        als (zwaarste techniek sinds de vorige invulling, cel, cijfer). Stopt als
+        het bord vol is of de technieken t/m GRADES[max_level] vastlopen.
+        """
+        techniques = [getattr(self, name) for name in GRADES[:max_level + 1]]
+        hardest = 0
+        values = self.values
+        while self.empty:
+            before = values[:]
+            for level, technique in enumerate(techniques):
+                if technique():
+                    hardest = max(hardest, level)
+                    break
+            else:
+                return
+            placed = [i for i in range(81) if values[i] != before[i]]
+            for i in placed:
+                yield GRADES[hardest], i, BIT_DIGIT[values[i]]
+            if placed:
+                hardest = 0
+
+    def run(self) -> str:
+        techniques = [getattr(self, name) for name in GRADES[:-1]]
+        while self.empty:
+            for level, technique in enumerate(techniques):
+                if technique():
+                    self.hardest = max(self.hardest, level)
+                    break
+            else:
+                return GRADES[-1]
+        return GRADES[self.hardest]
+
+
+def grade_puzzle(puzzle: str) -> str:
+    """Zwaarste techniek (uit GRADES) die nodig is om de puzzel op te lossen."""
+    return Grader(puzzle).run()
+
+# -----------------------------
+# Hints en zetcontrole
+# -----------------------------
+def str_to_grid(s: str) -> Grid:
+    return [[int(s[r * 9 + c]) for c in range(9)] for r in range(9)]
+
+def board_conflicts(board: str) -> List[int]:
+    """Cellen waarvan het cijfer nog eens in dezelfde rij, kolom of blok staat."""
+    dup_units = []
+    for unit in UNITS:
+        seen = dup = 0
+        for i in unit:
+            ch = board[i]
+            if ch != "0":
+                bit = 1 << (ord(ch) - 49)
+                dup |= seen & bit
+                seen |= bit
+        dup_units.append(dup)
+    conflicts = []
+    for i, ch in enumerate(board):
+        if ch != "0":
+            bit = 1 << (ord(ch) - 49)
+            if any(dup_units[u] & bit for u in (CELL_ROW[i], 9 + CELL_COL[i], 18 + CELL_BOX[i])):
+                conflicts.append(i)
+    return conflicts
+
+def check_board(puzzle: str, board: str, solution: str) -> dict:
+    """
+    Controle van een (half) ingevuld bord: conflicts zijn cellen die de regels
+    breken, wrong alle ingevulde cellen die niet met de oplossing kloppen.
+    """
+    wrong = [i for i in range(81) if board[i] != "0" and board[i] != solution[i]]
+    # een overschreven given telt ook als fout
+    wrong += [i for i in range(81) if puzzle[i] != "0" and board[i] == "0"]
+    return {
+        "conflicts": board_conflicts(board),
+        "wrong": sorted(wrong),
+        "solved": board == solution,
+    }
+
+def solution_path(puzzle: str) -> List[Tuple[str, int, int]]:
+    """Alle logische invullingen (techniek, cel, cijfer) vanaf de givens, op volgorde."""
+    return list(Grader(puzzle).placements())
+
+def next_hint(board: str, solution: str, path: Optional[List[Tuple[str, int, int]]] = None) -> Optional[dict]:
+    """
+    Volgende logische stap op een foutloos bord: welke cel, welk cijfer en met
+    welke techniek (uit GRADES). Eerst singles op het bord zelf; daarna de
+    eerste nog lege cel uit path (solution_path van de puzzel, of zonder path
+    alle technieken op het bord). Een stap uit de givens blijft geldig als er
+    meer cellen (goed) ingevuld zijn. Lopen de technieken vast, dan komt het
+    cijfer uit de oplossing met techniek "backtracking". None als het bord vol is.
+    """
+    step = next(Grader(board).placements(max_level=1), None)
+    if step is None:
+        if path is None:
+            step = next(Grader(board).placements(), None)
         else:
-            clues -= 1
+            step = next((s for s in path if board[s[1]] == "0"), None)
+    if step is None:
+        empty = [i for i in range(81) if board[i] == "0"]
+        if not empty:
+            return None
+        step = (GRADES[-1], empty[0], int(solution[empty[0]]))
+    technique, cell, digit = step
+    return {"technique": technique, "cell": cell, "digit": digit}
 
-    return grid, clues
+# -----------------------------
+# Parallel helpers
+# -----------------------------
+@contextmanager
+def ordered_map(workers: int = 1):
+    """
+    Geeft een map()-achtige functie terug die resultaten in invoervolgorde oplevert.
+    Met workers > 1 draait het werk in een process pool; de uitvoer blijft gelijk.
+    """
+    if workers <= 1:
+        yield map
+        return
+    ex = ProcessPoolExecutor(max_workers=workers)
+    try:
+        yield partial(ex.map, chunksize=8)
+    finally:
+        ex.shutdown(wait=True, cancel_futures=True)
 
 # -----------------------------
 # Daily generation
@@ -132,81 +1375,1008 @@ WEEKDAY_TO_DIFF = {
     6: "gemiddeld",
 }
 
-def generate_daily(start_date: str, days: int) -> List[dict]:
-    start = date.fromisoformat(start_date)
-    results = []
+def build_daily_entry(d_iso: str, solver: str = "bitboard", node_budget: Optional[int] = None,
+                      time_limit_sec: Optional[float] = None, sampler: str = "backtrack") -> Tuple[dict, dict]:
+    """Daily puzzel voor één datum, plus het telemetrie-record van die datum."""
+    start_t = time.perf_counter()
+    d = date.fromisoformat(d_iso)
+    diff = WEEKDAY_TO_DIFF[d.weekday()]
+    seed = int(d.strftime("%Y%m%d"))
+    stats = GenStats()
 
-    for i in range(days):
-        d = start + timedelta(days=i)
-        diff = WEEKDAY_TO_DIFF[d.weekday()]
-        seed = int(d.strftime("%Y%m%d"))
+    # probeer een paar keer als hij te langzaam is
+    for attempt in range(1, 50):
+        try:
+            sol, rng = new_solution(seed + attempt, sampler)
+            puzzle, clues = make_puzzle_unique(sol, diff, time_limit_sec=time_limit_sec,
+                                               solver=solver, node_budget=node_budget, stats=stats, rng=rng)
+            break
+        except TimeoutError:
+            continue
+    else:
+        raise RuntimeError(f"Kon geen daily puzzel maken voor {d_iso} ({diff}).")
 
-        # probeer een paar keer als hij te langzaam is
-        for attempt in range(1, 50):
-            try:
-                sol = generate_solution(seed + attempt)
-                puzzle, clues = make_puzzle_unique(sol, diff, time_limit_sec=1.25)
-                break
-            except TimeoutError:
-                continue
-        else:
-            raise RuntimeError(f"Kon geen daily puzzel maken voor {d.isoformat()} ({diff}).")
+    row = {
+        "date": d_iso,
+        "difficulty": diff,
+        "clues": clues,
+        "puzzle": grid_to_str(puzzle),
+        "solution": grid_to_str(sol)
+    }
+    record = {"date": d_iso, "category": diff, "seed": seed, "status": "ok",
+              "attempts": attempt, "timeouts": attempt - 1, "clues": clues,
+              **stats.as_dict(), "seconds": round(time.perf_counter() - start_t, 6)}
+    return row, record
 
-        results.append({
-            "date": d.isoformat(),
-            "difficulty": diff,
-            "clues": clues,
-            "puzzle": grid_to_str(puzzle),
-            "solution": grid_to_str(sol)
-        })
+def iter_daily(start_date: str, days: int, solver: str = "bitboard", workers: int = 1,
+               node_budget: Optional[int] = None, time_limit_sec: Optional[float] = None,
+               telemetry: Optional[Callable[[dict], None]] = None, sampler: str = "backtrack") -> Iterator[dict]:
+    """
+    Levert de daily puzzels één voor één, op datumvolgorde.
+    telemetry (optioneel) krijgt per datum een record met zoekstatistieken;
+    sampler kiest de oplossingsgrids (zie new_solution).
+    """
+    start = date.fromisoformat(start_date)
+    dates = [(start + timedelta(days=i)).isoformat() for i in range(days)]
 
-        if i % 100 == 0:
-            print(f"Generated daily {i}/{days} ({d.isoformat()}, diff={diff})")
+    with ordered_map(workers) as run:
+        for i, (row, record) in enumerate(run(partial(build_daily_entry, solver=solver, node_budget=node_budget,
+                                                      time_limit_sec=time_limit_sec, sampler=sampler), dates)):
+            if telemetry is not None:
+                telemetry(record)
+            yield row
 
-    return results
+            if i % 100 == 0:
+                print(f"Generated daily {i}/{days} ({row['date']}, diff={row['difficulty']})")
+
+def generate_daily(start_date: str, days: int, solver: str = "bitboard", workers: int = 1,
+                   node_budget: Optional[int] = None, time_limit_sec: Optional[float] = None,
+                   telemetry: Optional[Callable[[dict], None]] = None, sampler: str = "backtrack") -> List[dict]:
+    return list(iter_daily(start_date, days, solver=solver, workers=workers,
+                           node_budget=node_budget, time_limit_sec=time_limit_sec, telemetry=telemetry,
+                           sampler=sampler))
 
 # -----------------------------
 # Pack generation
 # -----------------------------
-def generate_pack(category: str, count: int, seed_base: int = 123456) -> List[dict]:
+def category_seed_offset(category: str) -> int:
+    # hash() is per proces gerandomiseerd; crc32 is overal gelijk
+    return zlib.crc32(category.encode("utf-8")) % 100000
+
+def build_pack_entry(category: str, seed: int, solver: str = "bitboard", node_budget: Optional[int] = None,
+                     time_limit_sec: Optional[float] = None, grades: Optional[List[str]] = None,
+                     sampler: str = "backtrack") -> Tuple[Optional[dict], dict]:
+    """
+    Puzzel voor één seed (zonder id), of None als alle pogingen te lang duren
+    of geen enkele poging een grade uit grades oplevert; plus het
+    telemetrie-record van de seed (ook als hij wordt overgeslagen).
+    """
+    start_t = time.perf_counter()
+    stats = GenStats()
+    timeouts = grade_rejects = 0
+
+    def record(status: str, attempts: int, clues: Optional[int] = None) -> dict:
+        return {"category": category, "seed": seed, "status": status,
+                "attempts": attempts, "timeouts": timeouts, "grade_rejects": grade_rejects,
+                "clues": clues, **stats.as_dict(), "seconds": round(time.perf_counter() - start_t, 6)}
+
+    # meerdere pogingen per id totdat we een goede puzzel hebben
+    for attempt in range(1, 80):
+        try:
+            sol, rng = new_solution(seed + attempt, sampler)
+            puzzle, clues = make_puzzle_unique(sol, category, time_limit_sec=time_limit_sec,
+                                               solver=solver, node_budget=node_budget, stats=stats, rng=rng)
+        except TimeoutError:
+            timeouts += 1
+            continue
+        puzzle_str = grid_to_str(puzzle)
+        grade = grade_puzzle(puzzle_str)
+        if grades and grade not in grades:
+            grade_rejects += 1
+            continue
+        row = {
+            "difficulty": category,
+            "clues": clues,
+            "grade": grade,
+            "puzzle": puzzle_str,
+            "solution": grid_to_str(sol)
+        }
+        return row, record("ok", attempt, clues)
+    return None, record("skipped", attempt)
+
+def iter_pack(category: str, count: int, seed_base: int = 123456,
+              solver: str = "bitboard", workers: int = 1, node_budget: Optional[int] = None,
+              time_limit_sec: Optional[float] = None, grades: Optional[List[str]] = None,
+              made: int = 0, seed_index: int = 1,
+              telemetry: Optional[Callable[[dict], None]] = None,
+              sampler: str = "backtrack") -> Iterator[Tuple[int, dict]]:
+    """
+    Levert (seed-index, rij) per puzzel, op id-volgorde. Met made en seed_index
+    gaat een onderbroken run verder na id made en seed-index seed_index - 1.
+    telemetry (optioneel) krijgt per seed een record, ook voor overgeslagen seeds;
+    sampler kiest de oplossingsgrids (zie new_solution).
+    """
     if category not in DIFFICULTY_CLUES:
         raise ValueError(f"Onbekende categorie: {category}")
 
-    results = []
-    made = 0
-    i = 1
+    i = seed_index
+    offset = category_seed_offset(category)
+    build = partial(build_pack_entry, category, solver=solver, node_budget=node_budget,
+                    time_limit_sec=time_limit_sec, grades=grades, sampler=sampler)
+
+    with ordered_map(workers) as run:
+        while made < count:
+            # seeds in blokken, zodat ids en volgorde niet van het aantal workers afhangen
+            block = range(i, i + count - made)
+            i += len(block)
+
+            for k, (entry, record) in zip(block, run(build, [seed_base + k + offset for k in block])):
+                if entry is None:
+                    # skip deze seed, probeer volgende
+                    if telemetry is not None:
+                        telemetry({**record, "seed_index": k, "id": None})
+                    continue
 
-    while made < count:
-        seed = seed_base + i + (hash(category) % 100000)
-        i += 1
+                made += 1
+                if telemetry is not None:
+                    telemetry({**record, "seed_index": k, "id": made})
+                yield k, {"id": made, **entry}
 
-        # meerdere pogingen per id totdat we een goede puzzel hebben
-        ok = False
-        for attempt in range(1, 80):
+                if made % 100 == 0:
+                    print(f"Generated pack {category} {made}/{count}")
+
+def generate_pack(category: str, count: int, seed_base: int = 123456,
+                  solver: str = "bitboard", workers: int = 1, node_budget: Optional[int] = None,
+                  time_limit_sec: Optional[float] = None, grades: Optional[List[str]] = None,
+                  telemetry: Optional[Callable[[dict], None]] = None,
+                  sampler: str = "backtrack") -> List[dict]:
+    return [row for _, row in iter_pack(category, count, seed_base=seed_base, solver=solver,
+                                        workers=workers, node_budget=node_budget,
+                                        time_limit_sec=time_limit_sec, grades=grades,
+                                        telemetry=telemetry, sampler=sampler)]
+
+# -----------------------------
+# Streaming output
+# -----------------------------
+# Tijdens het genereren gaat elke puzzel direct als regel naar <out>.jsonl; pas aan
+# het eind wordt daar het gewone json-bestand van gemaakt. Velden die met "_"
+# beginnen zijn alleen voor --resume en verdwijnen bij het compacteren.
+def jsonl_tail(path: str) -> Tuple[int, Optional[dict]]:
+    """
+    Aantal complete regels en de laatste regel van een jsonl-bestand.
+    Een half geschreven laatste regel (crash) wordt afgekapt.
+    """
+    if not os.path.exists(path):
+        return 0, None
+    done = 0
+    last = None
+    good_end = 0
+    with open(path, "rb+") as f:
+        for line in f:
             try:
-                sol = generate_solution(seed + attempt)
-                puzzle, clues = make_puzzle_unique(sol, category, time_limit_sec=1.25)
-                ok = True
+                obj = json.loads(line)
+            except ValueError:
                 break
-            except TimeoutError:
-                continue
+            if not line.endswith(b"\n"):
+                break
+            done += 1
+            last = obj
+            good_end += len(line)
+        f.truncate(good_end)
+    return done, last
 
-        if not ok:
-            # skip deze seed, probeer volgende
-            continue
+def append_jsonl(rows: Iterable[dict], path: str, checkpoint_every: int = 100) -> int:
+    """Schrijf rijen weg zodra ze binnenkomen; elke checkpoint_every regels naar schijf."""
+    n = 0
+    with open(path, "a", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+            n += 1
+            if n % checkpoint_every == 0:
+                f.flush()
+                os.fsync(f.fileno())
+    return n
 
-        made += 1
-        results.append({
-            "id": made,
-            "difficulty": category,
-            "clues": clues,
-            "puzzle": grid_to_str(puzzle),
-            "solution": grid_to_str(sol)
-        })
+def compact_jsonl(src: str, dst: str) -> int:
+    """
+    Zet een jsonl-bestand om naar dezelfde layout als json.dump(rows, f, indent=2),
+    zonder alle rijen tegelijk in het geheugen te houden.
+    """
+    n = 0
+    tmp = dst + ".tmp"
+    with open(src, "r", encoding="utf-8") as fin, open(tmp, "w", encoding="utf-8") as fout:
+        for line in fin:
+            row = {k: v for k, v in json.loads(line).items() if not k.startswith("_")}
+            fout.write("[\n  " if n == 0 else ",\n  ")
+            fout.write(json.dumps(row, indent=2).replace("\n", "\n  "))
+            n += 1
+        fout.write("\n]" if n else "[]")
+    os.replace(tmp, dst)
+    return n
+
+# -----------------------------
+# Telemetrie
+# -----------------------------
+# Met --telemetry schrijft daily/pack per seed een regel naar <out>.telemetry.jsonl:
+# zoeknodes, uniciteitschecks, geprobeerde en afgewezen verwijderingen, pogingen,
+# timeouts en wall time. Overgeslagen seeds staan er ook in (status "skipped").
+# Aan het eind van de run volgt een samenvatting met percentielen per categorie;
+# het subcommando telemetry maakt die ook achteraf (bv. over een hervatte run).
+TELEMETRY_FIELDS = ("seconds", "nodes", "checks", "rejected", "attempts")
+TELEMETRY_PERCENTILES = (50, 90, 99)
+
+@contextmanager
+def telemetry_writer(path: str, append: bool = False):
+    """Callable die telemetrie-records als jsonl-regels wegschrijft (regel-gebufferd)."""
+    with open(path, "a" if append else "w", encoding="utf-8", buffering=1) as f:
+        yield lambda record: f.write(json.dumps(record) + "\n")
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentiel van een gesorteerde, niet-lege lijst."""
+    k = max(0, min(len(sorted_values) - 1, -(-len(sorted_values) * q // 100) - 1))
+    return sorted_values[int(k)]
 
-        if made % 100 == 0:
-            print(f"Generated pack {category} {made}/{count}")
+def summarize_telemetry(path: str) -> Dict[str, dict]:
+    """Per categorie: tellingen en percentielen van TELEMETRY_FIELDS over alle seeds."""
+    # een hervatte run kan een seed twee keer bevatten; de laatste telt
+    records: Dict[Tuple[str, int], dict] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                r = json.loads(line)
+                records[(r["category"], r["seed"])] = r
+
+    by_cat: Dict[str, List[dict]] = {}
+    for r in records.values():
+        by_cat.setdefault(r["category"], []).append(r)
+
+    summary = {}
+    for cat, rows in by_cat.items():
+        s = {
+            "seeds": len(rows),
+            "ok": sum(r["status"] == "ok" for r in rows),
+            "skipped": sum(r["status"] == "skipped" for r in rows),
+            "timeouts": sum(r["timeouts"] for r in rows),
+            "grade_rejects": sum(r.get("grade_rejects", 0) for r in rows),
+            "seconds_total": sum(r["seconds"] for r in rows),
+        }
+        for field in TELEMETRY_FIELDS:
+            values = sorted(r[field] for r in rows)
+            s[field] = {f"p{q}": percentile(values, q) for q in TELEMETRY_PERCENTILES}
+            s[field]["max"] = values[-1]
+        summary[cat] = s
+    return summary
+
+def print_telemetry_summary(summary: Dict[str, dict]) -> None:
+    order = list(DIFFICULTY_CLUES)
+    for cat in sorted(summary, key=lambda c: order.index(c) if c in order else len(order)):
+        s = summary[cat]
+        print(f"{cat}: {s['seeds']} seeds, {s['ok']} puzzels, {s['skipped']} overgeslagen, "
+              f"{s['timeouts']} timeouts, {s['grade_rejects']} grade-afwijzingen, "
+              f"{s['seconds_total']:.1f} s totaal")
+        for field in TELEMETRY_FIELDS:
+            p = s[field]
+            fmt = "{:10.4f}" if field == "seconds" else "{:10.0f}"
+            cols = "  ".join(f"{k} " + fmt.format(v) for k, v in p.items())
+            print(f"  {field:<9} {cols}")
+
+# -----------------------------
+# Symmetrie-transformaties
+# -----------------------------
+# Een transformatie is (cell_map, digit_map): nieuw[i] = digit_map[oud[cell_map[i]]].
+# Cijfers hernoemen, rijen/kolommen binnen een band/stapel wisselen, banden en
+# stapels wisselen en transponeren houden een puzzel geldig en uniek.
+Transform = Tuple[List[int], List[int]]
 
+def _line_order(rng: random.Random) -> List[int]:
+    blocks = [0, 1, 2]
+    rng.shuffle(blocks)
+    order = []
+    for blk in blocks:
+        inner = [0, 1, 2]
+        rng.shuffle(inner)
+        order.extend(blk * 3 + k for k in inner)
+    return order
+
+def random_transform(rng: random.Random) -> Transform:
+    rows = _line_order(rng)
+    cols = _line_order(rng)
+    transpose = rng.random() < 0.5
+    digits = list(range(1, 10))
+    rng.shuffle(digits)
+
+    cell_map = []
+    for r in range(9):
+        for c in range(9):
+            rr, cc = rows[r], cols[c]
+            cell_map.append(cc * 9 + rr if transpose else rr * 9 + cc)
+    return cell_map, [0] + digits
+
+def apply_transform(s: str, transform: Transform) -> str:
+    cell_map, digit_map = transform
+    return "".join(str(digit_map[int(s[j])]) for j in cell_map)
+
+def multiply_rows(rows: List[dict], variants: int, seed: int = 0) -> List[dict]:
+    """
+    Originele rijen (ids ongewijzigd, dus bestaande links blijven kloppen), gevolgd
+    door variants rondes met per rij één getransformeerde variant. De transformatie
+    hangt alleen af van seed, ronde en het oorspronkelijke id, en is via StableRandom
+    op elke Python-versie dezelfde.
+    """
+    result = [dict(row) for row in rows]
+    next_id = max((row["id"] for row in rows), default=0) + 1
+    for k in range(1, variants + 1):
+        for row in rows:
+            rng = StableRandom(f"{seed}:{k}:{row['id']}")
+            transform = random_transform(rng)
+            result.append({
+                **row,
+                "id": next_id,
+                "puzzle": apply_transform(row["puzzle"], transform),
+                "solution": apply_transform(row["solution"], transform),
+            })
+            next_id += 1
+    return result
+
+# -----------------------------
+# Canonieke vorm en duplicaten
+# -----------------------------
+# De canonieke vorm van een oplossing is de lexicografisch kleinste string over de
+# hele symmetriegroep. In plaats van alle ~3 miljoen transformaties te proberen:
+# rij 1 wordt na hernoemen altijd 123456789, dus alleen de kolomvolgorde die rij 2
+# zo klein mogelijk maakt telt (branch-and-bound); de overige rijen volgen daarna
+# gretig. De puzzel wordt met dezelfde transformatie(s) meegenomen.
+def _min_row2_perms(sigma: List[int], best: List[Optional[List[int]]], found: List[tuple], tag: tuple) -> None:
+    """
+    Zoek kolomvolgordes (binnen stapels) die rij 2 minimaal maken. sigma[c] is de
+    kolom waar rij 1 het cijfer van rij 2 in kolom c heeft; rij 2 wordt dan
+    positie(sigma(perm[k])) op plek k. best en found worden gedeeld over alle
+    aanroepen, zodat slechtere startrijen vroeg afvallen.
+    """
+    perm = [-1] * 9
+    pos = [-1] * 9
+    slot_stack = [-1] * 3
+    stack_slot = [-1] * 3
+    vals = [0] * 9
+
+    def place(col: int, p: int) -> bool:
+        perm[p] = col
+        pos[col] = p
+        if slot_stack[p // 3] == -1:
+            slot_stack[p // 3] = col // 3
+            stack_slot[col // 3] = p // 3
+            return True
+        return False
+
+    def unplace(col: int, p: int, new_slot: bool) -> None:
+        perm[p] = -1
+        pos[col] = -1
+        if new_slot:
+            slot_stack[p // 3] = -1
+            stack_slot[col // 3] = -1
+
+    def first_free(col: int) -> int:
+        sl = stack_slot[col // 3]
+        if sl != -1:
+            for p in range(3 * sl, 3 * sl + 3):
+                if perm[p] == -1:
+                    return p
+        return 3 * slot_stack.index(-1)
+
+    def step(k: int, tight: bool) -> None:
+        # tight: het prefix is gelijk aan dat van best; anders is het al kleiner
+        if k == 9:
+            if not tight:
+                best[0] = vals[:]
+                found.clear()
+            found.append((tag, perm[:]))
+            return
+
+        if perm[k] != -1:
+            choices = [-1]
+        elif slot_stack[k // 3] != -1:
+            s = slot_stack[k // 3]
+            choices = [c for c in range(3 * s, 3 * s + 3) if pos[c] == -1]
+        else:
+            choices = [c for c in range(9) if stack_slot[c // 3] == -1]
+
+        for col in choices:
+            undo = []
+            if col != -1:
+                undo.append((col, k, place(col, k)))
+            target = sigma[perm[k]]
+            if pos[target] == -1:
+                # zo vroeg mogelijk plaatsen geeft de kleinste waarde op plek k
+                p = first_free(target)
+                undo.append((target, p, place(target, p)))
+            v = vals[k] = pos[target]
+            if not tight:
+                before = best[0]
+                step(k + 1, False)
+                # een nieuw best komt uit deze tak en deelt dus dit prefix
+                tight = best[0] is not before
+            elif v <= best[0][k]:
+                step(k + 1, v == best[0][k])
+            for item in reversed(undo):
+                unplace(*item)
+
+    step(0, best[0] is not None)
+
+def canonical_transforms(solution: str) -> List[Transform]:
+    """Alle transformaties die de oplossing op haar canonieke (minimale) vorm brengen."""
+    grids = (
+        [int(ch) for ch in solution],
+        [int(solution[c * 9 + r]) for r in range(9) for c in range(9)],
+    )
+    best: List[Optional[List[int]]] = [None]
+    found: List[tuple] = []
+    for t, g in enumerate(grids):
+        for r1 in range(9):
+            where1 = [0] * 10
+            for c in range(9):
+                where1[g[r1 * 9 + c]] = c
+            for r2 in range(r1 - r1 % 3, r1 - r1 % 3 + 3):
+                if r2 == r1:
+                    continue
+                sigma = [where1[g[r2 * 9 + c]] for c in range(9)]
+                _min_row2_perms(sigma, best, found, (t, r1, r2))
+
+    results = []
+    best_rows = None
+    for (t, r1, r2), perm in found:
+        g = grids[t]
+        relabel = [0] * 10
+        for k in range(9):
+            relabel[g[r1 * 9 + perm[k]]] = k + 1
+
+        def row(r):
+            return tuple(relabel[g[r * 9 + perm[k]]] for k in range(9))
+
+        band = r1 // 3
+        r3 = 3 * band + 3 - (r1 % 3) - (r2 % 3)
+        order = [r1, r2, 3 * band + r3 % 3]
+        # overige banden: de band met de kleinste rij eerst, rijen oplopend
+        others = sorted(
+            sorted(range(3 * b, 3 * b + 3), key=row)
+            for b in range(3) if b != band
+        )
+        others.sort(key=lambda rows: row(rows[0]))
+        order += others[0] + others[1]
+        rows = [row(r) for r in order]
+
+        if best_rows is None or rows < best_rows:
+            best_rows = rows
+            results = []
+        if rows == best_rows:
+            cell_map = [
+                perm[C] * 9 + order[R] if t else order[R] * 9 + perm[C]
+                for R in range(9) for C in range(9)
+            ]
+            results.append((cell_map, relabel))
+    return results
+
+def canonical_form(puzzle: str, solution: str) -> str:
+    """
+    Canonieke puzzelstring: gelijk voor alle puzzels die door hernoemen, rij-,
+    kolom-, band- en stapelwissels of transponeren in elkaar over te voeren zijn.
+    """
+    return min(apply_transform(puzzle, tf) for tf in canonical_transforms(solution))
+
+def build_canonical_index(sources: List[Tuple[str, List[dict]]], workers: int = 1) -> Dict[str, List[Tuple[str, object]]]:
+    """
+    Hash-index canonieke vorm -> [(bron, id of datum), ...] in invoervolgorde.
+    sources is een lijst van (naam, rijen) zoals ze uit de json-bestanden komen.
+    """
+    entries = []
+    jobs: Dict[Tuple[str, str], Optional[str]] = {}
+    for name, rows in sources:
+        for row in rows:
+            job = (row["puzzle"], row["solution"])
+            entries.append(((name, row.get("id", row.get("date"))), job))
+            jobs[job] = None
+
+    # letterlijke kopieën hoeven maar één keer gecanoniseerd te worden
+    with ordered_map(workers) as run:
+        for job, canon in zip(list(jobs), run(_canonical_job, list(jobs))):
+            jobs[job] = canon
+
+    index: Dict[str, List[Tuple[str, object]]] = {}
+    for key, job in entries:
+        index.setdefault(jobs[job], []).append(key)
+    return index
+
+def _canonical_job(job: Tuple[str, str]) -> str:
+    return canonical_form(*job)
+
+def drop_rows(rows: List[dict], drop_ids: set) -> List[dict]:
+    """Pack-rijen zonder drop_ids; de ids worden opnieuw 1..n genummerd."""
+    kept = [dict(row) for row in rows if row["id"] not in drop_ids]
+    for n, row in enumerate(kept, start=1):
+        row["id"] = n
+    return kept
+
+# -----------------------------
+# Grading van bestaande bestanden
+# -----------------------------
+def grade_rows(rows: List[dict], workers: int = 1) -> Dict[str, int]:
+    """Zet een "grade" veld in elke rij en geeft het aantal puzzels per grade terug."""
+    buckets = {grade: 0 for grade in GRADES}
+    with ordered_map(workers) as run:
+        for row, grade in zip(rows, run(grade_puzzle, [row["puzzle"] for row in rows])):
+            row["grade"] = grade
+            buckets[grade] += 1
+    return buckets
+
+# -----------------------------
+# Binair packformaat
+# -----------------------------
+# Header: magic, versie, recordgrootte, aantal puzzels en de categorie.
+# Per puzzel één record van PACK_RECORD.size bytes:
+#   41 bytes oplossing (twee cijfers per byte, hoge nibble eerst),
+#   11 bytes clue-masker (bit 7 van byte 0 = cel 0),
+#    1 byte  grade (index in GRADES, 0xFF = geen grade).
+# De id is de positie + 1 en clues is het aantal gezette maskerbits.
+PACK_MAGIC = b"SDKP"
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct("<4sHHI16s")
+PACK_RECORD = struct.Struct("<41s11sB")
+_NO_GRADE = 0xFF
+
+# cijfers 1-9 zijn geldige hex-cijfers: bytes.fromhex/.hex() doen het nibble-werk in C
+_CLUE_BITS = str.maketrans("0123456789", "0111111111")
+_BIT_TO_BYTE = bytes.maketrans(b"01", b"\x00\xff")
+_ASCII_ZEROS = int.from_bytes(b"0" * 81, "big")
+
+def encode_pack_row(row: dict) -> bytes:
+    packed = bytes.fromhex(row["solution"] + "0")
+    mask = int(row["puzzle"].translate(_CLUE_BITS), 2) << (88 - 81)
+    grade = GRADES.index(row["grade"]) if row.get("grade") in GRADES else _NO_GRADE
+    return PACK_RECORD.pack(packed, mask.to_bytes(11, "big"), grade)
+
+def decode_pack_record(record: bytes, n: int, difficulty: str) -> dict:
+    packed, mask, grade = PACK_RECORD.unpack(record)
+    solution = packed.hex()[:81]
+    bits = format(int.from_bytes(mask, "big") >> (88 - 81), "081b")
+    # per cel 0xff (clue) of 0x00 als masker over de ascii-oplossing; lege cellen worden "0"
+    keep = int.from_bytes(bits.encode("ascii").translate(_BIT_TO_BYTE), "big")
+    digits = int.from_bytes(solution.encode("ascii"), "big")
+    puzzle = ((digits & keep) | (_ASCII_ZEROS & ~keep)).to_bytes(81, "big").decode("ascii")
+    row = {
+        "id": n,
+        "difficulty": difficulty,
+        "clues": bits.count("1"),
+        "puzzle": puzzle,
+        "solution": solution,
+    }
+    if grade != _NO_GRADE:
+        row["grade"] = GRADES[grade]
+    return row
+
+def pack_bytes(rows: List[dict], difficulty: str) -> bytes:
+    """Pack-rijen (ids 1..n op volgorde) in het binaire formaat, header inbegrepen."""
+    for n, row in enumerate(rows, start=1):
+        if row["id"] != n:
+            raise ValueError(f"Pack-ids moeten 1..n zijn, rij {n} heeft id {row['id']}")
+    header = PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, PACK_RECORD.size, len(rows),
+                              difficulty.encode("ascii"))
+    return header + b"".join(encode_pack_row(row) for row in rows)
+
+def write_pack_bin(rows: List[dict], path: str, difficulty: str) -> int:
+    """Schrijf pack-rijen als binair bestand; atomisch via os.replace."""
+    data = pack_bytes(rows, difficulty)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(rows)
+
+class PackTable:
+    """
+    Binair pack in een buffer (bytes of mmap). Gedraagt zich als een lijst van
+    rij-dicts (len, [i], itereren), maar decodeert een rij pas bij opvragen.
+    Eén plat object in plaats van duizenden dicts en strings.
+    """
+    __slots__ = ("name", "difficulty", "count", "_buf")
+
+    def __init__(self, buf, name: str = "pack"):
+        self.name = name
+        if len(buf) < PACK_HEADER.size:
+            raise ValueError(f"{name}: te kort voor een binair pack")
+        magic, version, record_size, count, difficulty = PACK_HEADER.unpack_from(buf)
+        if magic != PACK_MAGIC or version != PACK_VERSION or record_size != PACK_RECORD.size:
+            raise ValueError(f"{name}: onbekend packformaat")
+        if len(buf) != PACK_HEADER.size + count * record_size:
+            raise ValueError(f"{name}: bestandsgrootte klopt niet met {count} puzzels")
+        self._buf = buf
+        self.count = count
+        self.difficulty = difficulty.rstrip(b"\0").decode("ascii")
+
+    @classmethod
+    def from_rows(cls, rows: List[dict], difficulty: str) -> "PackTable":
+        return cls(pack_bytes(rows, difficulty), name=difficulty)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> dict:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("puzzelnummer buiten het pack")
+        start = PACK_HEADER.size + i * PACK_RECORD.size
+        return decode_pack_record(self._buf[start:start + PACK_RECORD.size], i + 1, self.difficulty)
+
+class PackFile(PackTable):
+    """
+    Binair pack via mmap. Alle processen die hetzelfde bestand openen delen de
+    pagina's via de page cache van het OS.
+    """
+    __slots__ = ("path", "_file")
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path}: leeg bestand, geen binair pack")
+        try:
+            super().__init__(mm, name=path)
+        except ValueError:
+            mm.close()
+            self._file.close()
+            raise
+
+    def close(self):
+        self._buf.close()
+        self._file.close()
+
+# -----------------------------
+# Verificatie
+# -----------------------------
+# verify controleert packs en daily.json vóór een deploy. Met numpy gaan de
+# controles per bestand in één keer over (N, 81) uint8-arrays (een .bin wordt
+# direct uit de records gedecodeerd); zonder numpy doet een gewone lus hetzelfde,
+# trager maar met dezelfde uitkomst. Daarna controleert de bitboard solver
+# parallel of elke verder foutloze puzzel precies één oplossing heeft.
+VERIFY_CHUNK = 2000
+VERIFY_MAX_SHOWN = 20
+
+VERIFY_MESSAGES = {
+    "format": "puzzel of oplossing is geen string van 81 cijfers",
+    "digits": "oplossing heeft lege cellen of cijfers buiten 1-9",
+    "rows": "oplossing ongeldig: dubbel cijfer in een rij",
+    "cols": "oplossing ongeldig: dubbel cijfer in een kolom",
+    "boxes": "oplossing ongeldig: dubbel cijfer in een blok",
+    "givens": "givens wijken af van de oplossing",
+    "clues": "clues klopt niet met het aantal givens",
+    "id": "id klopt niet (verwacht positie + 1)",
+    "date": "datum ongeldig, dubbel of niet oplopend",
+    "difficulty": "difficulty past niet bij de datum of het pack",
+    "grade": "onbekende grade",
+    "unique": "puzzel heeft geen unieke oplossing",
+}
+
+def _numpy():
+    # optioneel: alleen verify gebruikt numpy; de website en de generator niet
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def load_puzzle_file(path: str):
+    """("daily" of "pack", rijen); een .bin blijft een PackFile."""
+    if path.endswith(".bin"):
+        return "pack", PackFile(path)
+    with open(path, "r", encoding="utf-8") as f:
+        rows = json.load(f)
+    return ("daily" if rows and "date" in rows[0] else "pack"), rows
+
+def default_verify_files() -> List[str]:
+    files = ["daily.json"] if os.path.exists("daily.json") else []
+    for cat in DIFFICULTY_CLUES:
+        files += [p for p in (f"packs/{cat}.json", f"packs/{cat}.bin") if os.path.exists(p)]
+    return files
+
+def expected_pack_difficulty(path: str, rows) -> str:
+    if isinstance(rows, PackTable):
+        return rows.difficulty
+    name = os.path.splitext(os.path.basename(path))[0]
+    return name if name in DIFFICULTY_CLUES else (rows[0].get("difficulty") if rows else "")
+
+def grid_checks_np(np, puz, sol, clues) -> Dict[str, object]:
+    """Per controle een bool-array (True = fout) over alle puzzels tegelijk."""
+    bits = (np.uint16(1) << sol.astype(np.uint16)) >> 1  # cijfer d -> bit d-1, 0 -> 0
+    g = bits.reshape(-1, 9, 9)
+    rows = np.bitwise_or.reduce(g, axis=2)
+    cols = np.bitwise_or.reduce(g, axis=1)
+    # (n, band, rij in band, stapel, kolom in stapel) -> (n, band, stapel)
+    boxes = np.bitwise_or.reduce(np.bitwise_or.reduce(g.reshape(-1, 3, 3, 3, 3), axis=4), axis=2)
+    given = puz != 0
+    return {
+        "digits": ((sol < 1) | (sol > 9)).any(axis=1),
+        "rows": (rows != FULL_MASK).any(axis=1),
+        "cols": (cols != FULL_MASK).any(axis=1),
+        "boxes": (boxes != FULL_MASK).any(axis=(1, 2)),
+        "givens": (given & (puz != sol)).any(axis=1),
+        "clues": given.sum(axis=1) != clues,
+    }
+
+def grid_checks_py(puzzles: List[str], solutions: List[str], clues: List[int]) -> Dict[str, object]:
+    """Zelfde controles als grid_checks_np, per puzzel in gewoon Python."""
+    out = {name: [] for name in ("digits", "rows", "cols", "boxes", "givens", "clues")}
+    for p, s, n in zip(puzzles, solutions, clues):
+        units = [len({s[i] for i in unit}) == 9 for unit in UNITS]
+        out["digits"].append("0" in s)
+        out["rows"].append(not all(units[0:9]))
+        out["cols"].append(not all(units[9:18]))
+        out["boxes"].append(not all(units[18:27]))
+        out["givens"].append(any(a != "0" and a != b for a, b in zip(p, s)))
+        out["clues"].append(81 - p.count("0") != n)
+    return out
+
+def _int_field(row: dict, key: str) -> int:
+    v = row.get(key)
+    return v if type(v) is int else -1
+
+def meta_checks(np, kind: str, rows, expected_diff: str) -> Dict[str, object]:
+    """Ids (packs), datums en weekdag-difficulty (daily) en grades."""
+    n = len(rows)
+    diffs = [row.get("difficulty") for row in rows]
+    grades = [row.get("grade") for row in rows]
+    out = {"grade": [g is not None and g not in GRADES for g in grades]}
+
+    if kind == "pack":
+        if np is not None:
+            ids = np.fromiter((_int_field(row, "id") for row in rows), np.int64, n)
+            out["id"] = ids != np.arange(1, n + 1)
+            out["difficulty"] = np.array(diffs, dtype=object) != expected_diff
+        else:
+            out["id"] = [_int_field(row, "id") != k for k, row in enumerate(rows, start=1)]
+            out["difficulty"] = [d != expected_diff for d in diffs]
+        return out
+
+    dates = [row.get("date") for row in rows]
+    if np is not None:
+        try:
+            days = np.array(dates, dtype="datetime64[D]")
+            bad = np.zeros(n, dtype=bool)
+        except (ValueError, TypeError):
+            bad = np.array([not _is_iso_date(d) for d in dates], dtype=bool)
+            days = np.array([d if not b else "NaT" for d, b in zip(dates, bad)], dtype="datetime64[D]")
+        # datetime64.str() geeft geen garantie op exact hetzelfde formaat; vergelijk terug
+        bad |= days.astype(str) != np.array(dates, dtype=object).astype(str)
+        d = days.astype(np.int64)
+        # elke datum moet na alle eerdere geldige datums komen
+        seen = np.maximum.accumulate(np.where(bad, np.iinfo(np.int64).min, d))
+        bad[1:] |= d[1:] <= seen[:-1]
+        week_diff = np.array([WEEKDAY_TO_DIFF[k] for k in range(7)], dtype=object)
+        out["date"] = bad
+        out["difficulty"] = week_diff[(d + 3) % 7] != np.array(diffs, dtype=object)  # 1970-01-01 was een donderdag
+        out["difficulty"] &= ~bad
+    else:
+        out["date"], out["difficulty"] = [], []
+        prev = ""
+        for d, diff in zip(dates, diffs):
+            ok = _is_iso_date(d) and d > prev
+            out["date"].append(not ok)
+            out["difficulty"].append(ok and WEEKDAY_TO_DIFF[date.fromisoformat(d).weekday()] != diff)
+            if ok:
+                prev = d
+    return out
+
+def _is_iso_date(d) -> bool:
+    try:
+        return isinstance(d, str) and date.fromisoformat(d).isoformat() == d
+    except ValueError:
+        return False
+
+def _bad_indices(np, mask) -> List[int]:
+    if np is not None:
+        return np.flatnonzero(mask).tolist()
+    return [i for i, b in enumerate(mask) if b]
+
+def _pack_table_rows(table: PackTable) -> List[dict]:
+    """Rijen van een binair pack; een onbekende grade-byte wordt een ongeldige grade i.p.v. een IndexError."""
+    rows = []
+    for i in range(len(table)):
+        start = PACK_HEADER.size + i * PACK_RECORD.size
+        record = table._buf[start:start + PACK_RECORD.size]
+        row = decode_pack_record(record[:-1] + bytes([_NO_GRADE]), i + 1, table.difficulty)
+        if record[-1] != _NO_GRADE:
+            row["grade"] = GRADES[record[-1]] if record[-1] < len(GRADES) else str(record[-1])
+        rows.append(row)
+    return rows
+
+def _non_unique(puzzles: List[str]) -> List[int]:
+    """Posities in deze chunk waarvan de puzzel niet precies één oplossing heeft."""
+    solver = BitboardSolver()
+    return [k for k, p in enumerate(puzzles) if not solver.load(str_to_grid(p)) or solver.count(2) != 1]
+
+def verify_rows(kind: str, rows, expected_diff: str = "", workers: int = 1,
+                unique: bool = True) -> List[Tuple[int, str]]:
+    """Alle fouten in rows als (positie, controle), op positie gesorteerd."""
+    np = _numpy()
+    n = len(rows)
+    errors: List[Tuple[int, str]] = []
+
+    def collect(checks: Dict[str, object], index: Optional[List[int]] = None):
+        for name, mask in checks.items():
+            for i in _bad_indices(np, mask):
+                errors.append((index[i] if index is not None else i, name))
+
+    if np is not None and isinstance(rows, PackTable):
+        # direct uit de records: 41 bytes oplossing (nibbles) + 11 bytes clue-masker
+        rec = np.frombuffer(rows._buf, np.uint8, count=n * PACK_RECORD.size,
+                            offset=PACK_HEADER.size).reshape(n, PACK_RECORD.size)
+        nibbles = np.empty((n, 82), np.uint8)
+        nibbles[:, 0::2] = rec[:, :41] >> 4
+        nibbles[:, 1::2] = rec[:, :41] & 0xF
+        sol = nibbles[:, :81]
+        puz = np.where(np.unpackbits(rec[:, 41:52], axis=1)[:, :81].astype(bool), sol, 0)
+        # nibbles 10-15 zijn geen cijfers: kapot record, net als een kapotte string in json
+        digits_ok = (sol <= 9).all(axis=1)
+        collect({"format": ~digits_ok})
+        valid = np.flatnonzero(digits_ok).tolist()
+        collect(grid_checks_np(np, puz[digits_ok], sol[digits_ok], (puz[digits_ok] != 0).sum(axis=1)), valid)
+        collect({"grade": (rec[:, 52] >= len(GRADES)) & (rec[:, 52] != _NO_GRADE)})
+        collect({"difficulty": np.full(n, rows.difficulty != expected_diff)})
+        puzzles = (puz + ord("0")).tobytes().decode("latin-1")
+        puzzle_at = lambda i: puzzles[i * 81:(i + 1) * 81]
+    else:
+        if isinstance(rows, PackTable):
+            rows = _pack_table_rows(rows)
+        puzzles = [row.get("puzzle") for row in rows]
+        solutions = [row.get("solution") for row in rows]
+        shaped = [type(p) is str and len(p) == 81 and type(q) is str and len(q) == 81
+                  for p, q in zip(puzzles, solutions)]
+        if np is not None:
+            valid = np.flatnonzero(shaped)
+            # één byte per teken (latin-1, de rest wordt "?"); alles buiten 0-9 valt na - "0" boven 9
+            to_array = lambda strs: (np.frombuffer("".join(strs[i] for i in valid).encode("latin-1", "replace"),
+                                                   np.uint8).reshape(-1, 81) - ord("0"))
+            puz, sol = to_array(puzzles), to_array(solutions)
+            digits_ok = (puz <= 9).all(axis=1) & (sol <= 9).all(axis=1)
+            collect({"format": ~np.isin(np.arange(n), valid[digits_ok])})
+            valid = valid[digits_ok].tolist()
+            clues = np.fromiter((_int_field(rows[i], "clues") for i in valid), np.int64, len(valid))
+            collect(grid_checks_np(np, puz[digits_ok], sol[digits_ok], clues), valid)
+        else:
+            valid = []
+            for i, ok in enumerate(shaped):
+                if ok and all(x.isascii() and x.isdigit() for x in (puzzles[i], solutions[i])):
+                    valid.append(i)
+                else:
+                    errors.append((i, "format"))
+            clues = [_int_field(rows[i], "clues") for i in valid]
+            collect(grid_checks_py([puzzles[i] for i in valid], [solutions[i] for i in valid], clues), valid)
+        collect(meta_checks(np, kind, rows, expected_diff))
+        puzzle_at = lambda i: rows[i]["puzzle"]
+
+    if unique:
+        broken = {i for i, name in errors if name in ("format", "digits", "rows", "cols", "boxes", "givens")}
+        todo = [i for i in valid if i not in broken]
+        chunks = [todo[k:k + VERIFY_CHUNK] for k in range(0, len(todo), VERIFY_CHUNK)]
+        with ordered_map(workers) as run:
+            for chunk, bad in zip(chunks, run(_non_unique, [[puzzle_at(i) for i in c] for c in chunks])):
+                errors.extend((chunk[k], "unique") for k in bad)
+
+    errors.sort()
+    return errors
+
+def verify_file(path: str, workers: int = 1, unique: bool = True) -> Tuple[int, List[Tuple[str, str]]]:
+    """(aantal puzzels, [(label, melding)]) voor één bestand."""
+    try:
+        kind, rows = load_puzzle_file(path)
+    except (OSError, ValueError) as e:
+        return 0, [("bestand", str(e))]
+    expected = expected_pack_difficulty(path, rows) if kind == "pack" else ""
+    errors = verify_rows(kind, rows, expected, workers=workers, unique=unique)
+
+    def label(i: int) -> str:
+        if kind == "daily":
+            return str(rows[i].get("date"))
+        return f"#{i + 1}"
+    return len(rows), [(label(i), VERIFY_MESSAGES[name]) for i, name in errors]
+
+# -----------------------------
+# Sampler-kwaliteit
+# -----------------------------
+# sampler-check vergelijkt sample_solution met het oorspronkelijke generate_solution
+# op dezelfde seeds: snelheid, dubbele grids, echt verschillende grids (canonieke
+# vorm), gelijkmatigheid van de cijfers per cel (chi-kwadraat) en de structuur
+# van de grids (aantal onvermijdbare verzamelingen, en hoeveel daarvan 4 cellen
+# groot zijn). Een sampler die variatie verliest valt op een van die punten door.
+SAMPLER_MAX_CHI2 = 1.3  # chi2 per vrijheidsgraad; ~1 bij gelijkmatige cijfers
+SAMPLER_MAX_Z = 4.0     # verschil in gemiddelde structuur, in standaardfouten
+
+def grid_structure(grid: Grid) -> Tuple[int, int]:
+    sets = unavoidable_sets(grid)
+    return len(sets), sum(1 for u in sets if bin(u).count("1") == 4)
+
+def _mean_var(values: List[float]) -> Tuple[float, float]:
+    mean = sum(values) / len(values)
+    return mean, sum((v - mean) ** 2 for v in values) / len(values)
+
+def sampler_report(grids: List[Grid], seconds: float, canonical: int) -> dict:
+    n = len(grids)
+    strs = [grid_to_str(g) for g in grids]
+    counts = [[0] * 10 for _ in range(81)]
+    for s in strs:
+        for i, ch in enumerate(s):
+            counts[i][ord(ch) - 48] += 1
+    expected = n / 9
+    chi2 = sum((counts[i][v] - expected) ** 2 / expected for i in range(81) for v in range(1, 10))
+    structure = [grid_structure(g) for g in grids]
+    sample = strs[:canonical]
+    return {
+        "us_per_grid": seconds / n * 1e6,
+        "distinct": len(set(strs)),
+        "distinct_canonical": len({canonical_form(s, s) for s in sample}),
+        "canonical_checked": len(sample),
+        "chi2_per_dof": chi2 / (81 * 8),
+        "sets": _mean_var([a for a, _ in structure]),
+        "sets4": _mean_var([b for _, b in structure]),
+    }
+
+def sampler_quality(count: int = 1000, seed_base: int = 0, canonical: int = 200) -> dict:
+    """Rapport per sampler plus de z-scores van het structuurverschil en een oordeel."""
+    start_t = time.perf_counter()
+    ref = [generate_solution(seed_base + i) for i in range(count)]
+    ref_s = time.perf_counter() - start_t
+    start_t = time.perf_counter()
+    fast = [sample_solution(StableRandom(seed_base + i)) for i in range(count)]
+    fast_s = time.perf_counter() - start_t
+
+    report = {"backtrack": sampler_report(ref, ref_s, canonical), "fast": sampler_report(fast, fast_s, canonical)}
+    z = {}
+    for key in ("sets", "sets4"):
+        (ma, va), (mb, vb) = report["backtrack"][key], report["fast"][key]
+        se = ((va + vb) / count) ** 0.5
+        z[key] = (mb - ma) / se if se else 0.0
+    f = report["fast"]
+    problems = []
+    if sampler_golden() != SAMPLER_GOLDEN:
+        problems.append("grids per seed wijken af van SAMPLER_GOLDEN (reproduceerbaarheid)")
+    if f["distinct"] < count:
+        problems.append(f"{count - f['distinct']} dubbele grids")
+    if f["distinct_canonical"] < f["canonical_checked"]:
+        problems.append(f"{f['canonical_checked'] - f['distinct_canonical']} isomorfe grids")
+    if f["chi2_per_dof"] > SAMPLER_MAX_CHI2:
+        problems.append(f"cijfers per cel niet gelijkmatig (chi2/dof {f['chi2_per_dof']:.2f})")
+    for key, value in z.items():
+        if abs(value) > SAMPLER_MAX_Z:
+            problems.append(f"structuur ({key}) wijkt af van backtrack (z={value:.1f})")
+    return {"samplers": report, "z": z, "problems": problems}
+
+# -----------------------------
+# Solver benchmark
+# -----------------------------
+def bench_count_backends(solvers: List[str], count: int, seed_base: int = 123456) -> dict:
+    """
+    Meet uniciteitschecks per seconde op extreem puzzels (18-23 clues).
+    Net als in make_puzzle_unique wordt telkens één clue weggehaald en met limit=2 geteld.
+    """
+    cases = []
+    for i in range(count):
+        sol = generate_solution(seed_base + i)
+        puzzle, _ = make_puzzle_unique(sol, "extreem")
+        for r in range(9):
+            for c in range(9):
+                if puzzle[r][c]:
+                    test = copy_grid(puzzle)
+                    test[r][c] = 0
+                    cases.append(test)
+
+    results = {}
+    for name in solvers:
+        counter = COUNT_BACKENDS[name]
+        start_t = time.perf_counter()
+        for test in cases:
+            counter(test, limit=2)
+        results[name] = len(cases) / (time.perf_counter() - start_t)
     return results
 
 def main():
@@ -217,26 +2387,242 @@ def main():
     p_daily.add_argument("--start-date", required=True, help="YYYY-MM-DD")
     p_daily.add_argument("--days", type=int, required=True)
     p_daily.add_argument("--out", default="daily.json")
+    p_daily.add_argument("--solver", choices=list(COUNT_BACKENDS.keys()), default="bitboard")
+    p_daily.add_argument("--workers", type=int, default=1, help="Aantal processen")
+    p_daily.add_argument("--resume", action="store_true",
+                         help="Ga verder met een onderbroken run (<out>.jsonl)")
+    p_daily.add_argument("--checkpoint-every", type=int, default=100,
+                         help="Om de zoveel puzzels naar schijf flushen")
+    p_daily.add_argument("--node-budget", type=int, default=None,
+                         help="Max. zoeknodes per puzzel (standaard per solver)")
+    p_daily.add_argument("--time-limit", type=float, default=None,
+                         help="Optionele wall-clock limiet per puzzel in seconden")
+    p_daily.add_argument("--telemetry", action="store_true",
+                         help="Zoekstatistieken per seed naar <out>.telemetry.jsonl, met samenvatting")
+    p_daily.add_argument("--sampler", choices=SOLUTION_SAMPLERS, default="backtrack",
+                         help="Oplossingsgrids: backtrack (bestaande seeds, zelfde puzzels) of fast")
 
     p_pack = sub.add_parser("pack", help="Generate puzzles for 1 category")
     p_pack.add_argument("--category", required=True, choices=list(DIFFICULTY_CLUES.keys()))
     p_pack.add_argument("--count", type=int, required=True)
     p_pack.add_argument("--out", required=True)
     p_pack.add_argument("--seed-base", type=int, default=123456)
+    p_pack.add_argument("--solver", choices=list(COUNT_BACKENDS.keys()), default="bitboard")
+    p_pack.add_argument("--workers", type=int, default=1, help="Aantal processen")
+    p_pack.add_argument("--resume", action="store_true",
+                        help="Ga verder met een onderbroken run (<out>.jsonl)")
+    p_pack.add_argument("--checkpoint-every", type=int, default=100,
+                        help="Om de zoveel puzzels naar schijf flushen")
+    p_pack.add_argument("--node-budget", type=int, default=None,
+                        help="Max. zoeknodes per puzzel (standaard per solver)")
+    p_pack.add_argument("--time-limit", type=float, default=None,
+                        help="Optionele wall-clock limiet per puzzel in seconden")
+    p_pack.add_argument("--telemetry", action="store_true",
+                        help="Zoekstatistieken per seed naar <out>.telemetry.jsonl, met samenvatting")
+    p_pack.add_argument("--sampler", choices=SOLUTION_SAMPLERS, default="backtrack",
+                        help="Oplossingsgrids: backtrack (bestaande seeds, zelfde puzzels) of fast")
+    p_pack.add_argument("--grades", nargs="+", choices=GRADES, default=None,
+                        help="Alleen puzzels met een van deze grades opnemen")
+
+    p_mult = sub.add_parser("multiply", help="Vergroot een pack met getransformeerde varianten")
+    p_mult.add_argument("--in", dest="src", required=True, help="Bestaand pack, bv. packs/extreem.json")
+    p_mult.add_argument("--variants", type=int, required=True, help="Varianten per puzzel")
+    p_mult.add_argument("--out", required=True)
+    p_mult.add_argument("--seed", type=int, default=0)
+
+    p_dedupe = sub.add_parser("dedupe", help="Zoek (isomorfe) duplicaten in packs en daily.json")
+    p_dedupe.add_argument("--daily", default="daily.json")
+    p_dedupe.add_argument("--packs", nargs="+",
+                          default=[f"packs/{cat}.json" for cat in DIFFICULTY_CLUES])
+    p_dedupe.add_argument("--remove", action="store_true",
+                          help="Verwijder dubbele pack-puzzels; daily puzzels blijven altijd staan")
+    p_dedupe.add_argument("--workers", type=int, default=1, help="Aantal processen")
+
+    p_grade = sub.add_parser("grade", help="Zet een grade veld in bestaande pack/daily bestanden")
+    p_grade.add_argument("files", nargs="+")
+    p_grade.add_argument("--workers", type=int, default=1, help="Aantal processen")
+
+    p_tele = sub.add_parser("telemetry", help="Samenvatting (percentielen per categorie) van telemetrie-bestanden")
+    p_tele.add_argument("files", nargs="+", help="Bv. packs/extreem.json.telemetry.jsonl")
+
+    p_bin = sub.add_parser("pack-bin", help="Zet pack json-bestanden om naar het binaire formaat (.bin)")
+    p_bin.add_argument("files", nargs="+")
+
+    p_verify = sub.add_parser("verify", help="Controleer packs en daily.json vóór een deploy (exitcode 1 bij fouten)")
+    p_verify.add_argument("files", nargs="*",
+                          help="Standaard daily.json en packs/<categorie>.json/.bin die bestaan")
+    p_verify.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                          help="Aantal processen voor de uniciteitscheck")
+    p_verify.add_argument("--no-unique", action="store_true", help="Sla de uniciteitscheck over")
+
+    p_sampler = sub.add_parser("sampler-check", help="Vergelijk de fast sampler met backtrack (snelheid en variatie)")
+    p_sampler.add_argument("--count", type=int, default=1000, help="Aantal grids per sampler")
+    p_sampler.add_argument("--seed-base", type=int, default=0)
+    p_sampler.add_argument("--canonical", type=int, default=200,
+                           help="Aantal grids waarvan de canonieke vorm wordt vergeleken (traag)")
+
+    p_bench = sub.add_parser("bench-solvers", help="Vergelijk uniciteitschecks per seconde per backend")
+    p_bench.add_argument("--count", type=int, default=20, help="Aantal extreem puzzels")
+    p_bench.add_argument("--seed-base", type=int, default=123456)
+    p_bench.add_argument("--solvers", nargs="+", choices=list(COUNT_BACKENDS.keys()),
+                         default=["bitboard", "dlx"])
 
     args = p.parse_args()
 
     if args.mode == "daily":
-        data = generate_daily(args.start_date, args.days)
-        with open(args.out, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-        print(f"Klaar! {args.out} is aangemaakt met {len(data)} puzzels.")
+        partial_out = args.out + ".jsonl"
+        start_date, days = args.start_date, args.days
+        done, last = jsonl_tail(partial_out) if args.resume else (0, None)
+        if last is None:
+            open(partial_out, "w").close()
+        else:
+            start_date = (date.fromisoformat(last["date"]) + timedelta(days=1)).isoformat()
+            days -= done
+            print(f"Hervat na {last['date']} ({done} puzzels al klaar).")
+
+        tele_out = args.out + ".telemetry.jsonl"
+        with telemetry_writer(tele_out, append=last is not None) if args.telemetry else nullcontext() as tele:
+            rows = iter_daily(start_date, days, solver=args.solver,
+                              workers=args.workers, node_budget=args.node_budget,
+                              time_limit_sec=args.time_limit, telemetry=tele, sampler=args.sampler)
+            append_jsonl(rows, partial_out, checkpoint_every=args.checkpoint_every)
+        n = compact_jsonl(partial_out, args.out)
+        os.remove(partial_out)
+        print(f"Klaar! {args.out} is aangemaakt met {n} puzzels.")
+        if args.telemetry:
+            print_telemetry_summary(summarize_telemetry(tele_out))
 
     elif args.mode == "pack":
-        data = generate_pack(args.category, args.count, seed_base=args.seed_base)
+        partial_out = args.out + ".jsonl"
+        made, seed_index = 0, 1
+        done, last = jsonl_tail(partial_out) if args.resume else (0, None)
+        if last is None:
+            open(partial_out, "w").close()
+        else:
+            made, seed_index = last["id"], last["_seed_index"] + 1
+            print(f"Hervat na id {made}.")
+
+        tele_out = args.out + ".telemetry.jsonl"
+        with telemetry_writer(tele_out, append=last is not None) if args.telemetry else nullcontext() as tele:
+            rows = ({**row, "_seed_index": k} for k, row in iter_pack(
+                args.category, args.count, seed_base=args.seed_base,
+                solver=args.solver, workers=args.workers,
+                node_budget=args.node_budget, time_limit_sec=args.time_limit,
+                grades=args.grades, made=made, seed_index=seed_index, telemetry=tele,
+                sampler=args.sampler))
+            append_jsonl(rows, partial_out, checkpoint_every=args.checkpoint_every)
+        n = compact_jsonl(partial_out, args.out)
+        os.remove(partial_out)
+        print(f"Klaar! {args.out} is aangemaakt met {n} puzzels.")
+        if args.telemetry:
+            print_telemetry_summary(summarize_telemetry(tele_out))
+
+    elif args.mode == "telemetry":
+        for path in args.files:
+            print(f"== {path}")
+            print_telemetry_summary(summarize_telemetry(path))
+
+    elif args.mode == "multiply":
+        with open(args.src, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+        data = multiply_rows(rows, args.variants, seed=args.seed)
         with open(args.out, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2)
         print(f"Klaar! {args.out} is aangemaakt met {len(data)} puzzels.")
 
+    elif args.mode == "dedupe":
+        sources = []
+        for path in [args.daily] + args.packs:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    sources.append((path, json.load(f)))
+
+        # de eerste vindplaats blijft (daily eerst), de rest is een duplicaat
+        index = build_canonical_index(sources, workers=args.workers)
+        drop: Dict[str, set] = {}
+        groups = 0
+        for keys in index.values():
+            if len(keys) < 2:
+                continue
+            groups += 1
+            print(" = ".join(f"{path}:{key}" for path, key in keys))
+            for path, key in keys[1:]:
+                if path != args.daily:
+                    drop.setdefault(path, set()).add(key)
+
+        total = sum(len(rows) for _, rows in sources)
+        print(f"{total} puzzels, {len(index)} uniek, {groups} groepen met duplicaten.")
+
+        if args.remove:
+            for path, rows in sources:
+                if path not in drop:
+                    continue
+                kept = drop_rows(rows, drop[path])
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(kept, f, indent=2)
+                print(f"{path}: {len(rows) - len(kept)} verwijderd, {len(kept)} over.")
+
+    elif args.mode == "grade":
+        for path in args.files:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            buckets = grade_rows(data, workers=args.workers)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            summary = ", ".join(f"{grade}={n}" for grade, n in buckets.items() if n)
+            print(f"{path}: {len(data)} puzzels ({summary})")
+
+    elif args.mode == "verify":
+        files = args.files or default_verify_files()
+        if not files:
+            raise SystemExit("Geen bestanden om te controleren.")
+        if _numpy() is None:
+            print("numpy niet gevonden: controles lopen zonder vectorisatie (trager).")
+        failed = 0
+        for path in files:
+            start_t = time.perf_counter()
+            n, errors = verify_file(path, workers=args.workers, unique=not args.no_unique)
+            took = time.perf_counter() - start_t
+            if not errors:
+                print(f"OK   {path}: {n} puzzels ({took:.2f} s)")
+                continue
+            failed += 1
+            print(f"FOUT {path}: {len(errors)} fouten in {n} puzzels ({took:.2f} s)")
+            for where, msg in errors[:VERIFY_MAX_SHOWN]:
+                print(f"  {where}: {msg}")
+            if len(errors) > VERIFY_MAX_SHOWN:
+                print(f"  ... en nog {len(errors) - VERIFY_MAX_SHOWN}")
+        if failed:
+            raise SystemExit(1)
+
+    elif args.mode == "sampler-check":
+        result = sampler_quality(args.count, seed_base=args.seed_base, canonical=args.canonical)
+        for name, r in result["samplers"].items():
+            print(f"{name:>9}: {r['us_per_grid']:7.0f} us/grid, {r['distinct']}/{args.count} verschillend, "
+                  f"{r['distinct_canonical']}/{r['canonical_checked']} niet-isomorf, "
+                  f"chi2/dof {r['chi2_per_dof']:.3f}, onvermijdbaar {r['sets'][0]:.2f} "
+                  f"(4 cellen: {r['sets4'][0]:.2f})")
+        print("structuurverschil fast t.o.v. backtrack: "
+              + ", ".join(f"{k} z={v:+.2f}" for k, v in result["z"].items()))
+        for problem in result["problems"]:
+            print(f"PROBLEEM: {problem}")
+        if result["problems"]:
+            raise SystemExit(1)
+        print("Fast sampler OK.")
+
+    elif args.mode == "pack-bin":
+        for path in args.files:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            difficulty = data[0]["difficulty"] if data else os.path.splitext(os.path.basename(path))[0]
+            out = os.path.splitext(path)[0] + ".bin"
+            n = write_pack_bin(data, out, difficulty)
+            print(f"{out}: {n} puzzels, {os.path.getsize(out)} bytes")
+
+    elif args.mode == "bench-solvers":
+        results = bench_count_backends(args.solvers, args.count, seed_base=args.seed_base)
+        for name, rate in results.items():
+            print(f"{name:>9}: {rate:10.1f} uniciteitschecks/s")
+
 if __name__ == "__main__":
     main()
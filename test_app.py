@@ -0,0 +1,58 @@
+import json
+import os
+from datetime import date, timedelta
+
+import pytest
+
+PACK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "packs")
+
+@pytest.fixture(scope="module")
+def site(tmp_path_factory):
+    """app.py met de packs uit de repo en een daily.json van drie dagen tot en met vandaag."""
+    root = tmp_path_factory.mktemp("site")
+    os.symlink(PACK_DIR, root / "packs")
+    with open(os.path.join(PACK_DIR, "gemiddeld.json"), "r", encoding="utf-8") as f:
+        rows = json.load(f)[:3]
+    today = date.today()
+    daily = [
+        {"date": (today - timedelta(days=2 - k)).isoformat(), "difficulty": row["difficulty"],
+         "clues": row["clues"], "puzzle": row["puzzle"], "solution": row["solution"]}
+        for k, row in enumerate(rows)
+    ]
+    (root / "daily.json").write_text(json.dumps(daily), encoding="utf-8")
+
+    mp = pytest.MonkeyPatch()
+    mp.chdir(root)
+    import app
+    app.STORE.reload(force=True)
+    yield app
+    mp.undo()
+
+@pytest.fixture
+def client(site):
+    return site.app.test_client()
+
+# -----------------------------
+# API
+# -----------------------------
+@pytest.mark.parametrize("cat", ["extreem", "Extreem", "EXTREEM"])
+def test_api_pack_category_any_case(client, cat):
+    resp = client.get(f"/api/v1/pack/{cat}/1")
+    assert resp.status_code == 200
+    assert resp.get_json()["difficulty"] == "extreem"
+
+    resp = client.get(f"/api/v1/pack/{cat}?from=2&count=3")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["category"] == "extreem"
+    assert [row["id"] for row in body["items"]] == [2, 3, 4]
+
+def test_api_pack_unknown_category(client):
+    assert client.get("/api/v1/pack/onbekend/1").status_code == 404
+    assert client.get("/api/v1/pack/onbekend").status_code == 404
+
+def test_api_hint_pack_any_case(client, site):
+    row = site.get_data().packs["extreem"][0]
+    resp = client.post("/api/v1/hint", json={"pack": "Extreem", "id": 1, "board": row["puzzle"]})
+    assert resp.status_code == 200
+    assert resp.get_json()["hint"] is not None
@@ -0,0 +1,140 @@
+import glob
+import json
+import os
+import random
+
+import pytest
+
+import sudoku_generator as sg
+
+PACK_FILES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "packs", "*.json")))
+
+# -----------------------------
+# Packs
+# -----------------------------
+def load_pack(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+@pytest.mark.parametrize("path", PACK_FILES, ids=os.path.basename)
+def test_pack_puzzles_unique_and_solved(path):
+    rows = load_pack(path)
+    assert rows
+    for row in rows:
+        puzzle = sg.str_to_grid(row["puzzle"])
+        assert sg.count_solutions(sg.copy_grid(puzzle), limit=2) == 1, row["id"]
+        assert sg.solve(puzzle), row["id"]
+        assert sg.grid_to_str(puzzle) == row["solution"], row["id"]
+
+# -----------------------------
+# Grader
+# -----------------------------
+@pytest.mark.parametrize("path", PACK_FILES, ids=os.path.basename)
+def test_grade_matches_pack(path):
+    for row in load_pack(path)[::5]:
+        assert sg.grade_puzzle(row["puzzle"]) == row["grade"], row["id"]
+
+@pytest.mark.parametrize("path", PACK_FILES, ids=os.path.basename)
+def test_solution_path_follows_solution(path):
+    for row in load_pack(path)[::5]:
+        path_steps = sg.solution_path(row["puzzle"])
+        cells = [cell for _, cell, _ in path_steps]
+        assert len(cells) == len(set(cells)), row["id"]
+        for technique, cell, digit in path_steps:
+            assert technique in sg.GRADES, row["id"]
+            assert row["puzzle"][cell] == "0", row["id"]
+            assert row["solution"][cell] == str(digit), (row["id"], technique, cell)
+
+@pytest.mark.parametrize("path", PACK_FILES[:1], ids=os.path.basename)
+def test_multiply_rows_valid_and_reproducible(path):
+    rows = load_pack(path)[:3]
+    variants = sg.multiply_rows(rows, 2, seed=5)
+    assert variants == sg.multiply_rows(rows, 2, seed=5)
+    assert [row["id"] for row in variants[3:]] == list(range(rows[-1]["id"] + 1, rows[-1]["id"] + 7))
+    for row in variants[3:]:
+        puzzle = sg.str_to_grid(row["puzzle"])
+        assert sg.count_solutions(sg.copy_grid(puzzle), limit=2) == 1
+        assert sg.solve(puzzle) and sg.grid_to_str(puzzle) == row["solution"]
+
+# -----------------------------
+# Telbackends tegen de naïeve referentie
+# -----------------------------
+def partial_grids(count: int = 40):
+    """Oplossingen met 30..60 lege cellen: van uniek tot veel oplossingen."""
+    rng = random.Random(20240601)
+    grids = []
+    for i in range(count):
+        grid = sg.generate_solution(1000 + i)
+        for i in rng.sample(range(81), rng.randint(30, 60)):
+            grid[i // 9][i % 9] = 0
+        grids.append(grid)
+    return grids
+
+def conflicting_grids():
+    """Givens die elkaar tegenspreken, met en zonder lege cellen."""
+    grids = []
+    solution = sg.generate_solution(7)
+    full = sg.copy_grid(solution)
+    full[0][0], full[0][1] = full[0][1], full[0][0]  # kolommen 0 en 1 hebben nu elk een dubbel cijfer
+    grids.append(full)
+
+    for empties in (10, 40, 70):
+        grid = sg.copy_grid(solution)
+        for i in random.Random(empties).sample(range(9, 81), empties):
+            grid[i // 9][i % 9] = 0
+        grid[8][0] = grid[0][0]  # zelfde cijfer twee keer in kolom 0
+        grids.append(grid)
+
+    row = sg.str_to_grid("0" * 81)
+    row[4][2] = row[4][7] = 5
+    grids.append(row)
+    box = sg.str_to_grid("0" * 81)
+    box[0][0] = box[2][2] = 9
+    grids.append(box)
+    return grids
+
+@pytest.mark.parametrize("backend", ["bitboard", "dlx"])
+@pytest.mark.parametrize("limit", [1, 2, 3, 10])
+def test_counts_match_naive(backend, limit):
+    count = sg.COUNT_BACKENDS[backend]
+    for grid in partial_grids():
+        expected = sg.count_solutions_naive(sg.copy_grid(grid), limit)
+        assert count(sg.copy_grid(grid), limit) == expected, sg.grid_to_str(grid)
+
+@pytest.mark.parametrize("backend", ["bitboard", "dlx"])
+def test_conflicting_givens_have_no_solutions(backend):
+    count = sg.COUNT_BACKENDS[backend]
+    for grid in conflicting_grids():
+        s = sg.grid_to_str(grid)
+        assert sg.count_solutions_naive(sg.copy_grid(grid), 2) == 0, s
+        assert count(sg.copy_grid(grid), 2) == 0, s
+
+def test_count_leaves_grid_untouched():
+    grid = partial_grids(1)[0]
+    before = sg.grid_to_str(grid)
+    for count in sg.COUNT_BACKENDS.values():
+        count(grid, 5)
+        assert sg.grid_to_str(grid) == before
+
+# -----------------------------
+# Verwijderlus
+# -----------------------------
+@pytest.mark.parametrize("difficulty", ["moeilijk", "extreem"])
+def test_incremental_removal_matches_dlx_loop(difficulty):
+    for seed in range(4):
+        solution = sg.generate_solution(2000 + seed)
+        puzzles = [
+            sg.make_puzzle_unique(sg.copy_grid(solution), difficulty, solver=solver, rng=random.Random(seed))
+            for solver in ("bitboard", "dlx")
+        ]
+        assert puzzles[0] == puzzles[1], (difficulty, seed)
+
+def test_unavoidable_sets_swap_to_other_solution():
+    solution = sg.generate_solution(3)
+    for u in sg.unavoidable_sets(solution):
+        cells = [i for i in range(81) if u >> i & 1]
+        a, b = {solution[i // 9][i % 9] for i in cells}
+        grid = sg.copy_grid(solution)
+        for i in cells:
+            grid[i // 9][i % 9] = a + b - grid[i // 9][i % 9]
+        assert grid != solution and sg.givens_valid(grid)